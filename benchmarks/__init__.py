@@ -0,0 +1,10 @@
+"""
+End-to-end performance benchmarks for the search platform.
+
+Runs entirely in-process with local stand-ins for the external
+services (in-memory vector store, SQLite, fakeredis), so results
+are reproducible on any machine and comparable across commits.
+
+Usage:
+    python -m benchmarks.run --help
+"""
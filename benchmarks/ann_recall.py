@@ -0,0 +1,146 @@
+# benchmarks/ann_recall.py
+"""
+Recall@k vs latency of each search mode (exact / fast / balanced)
+against a real Qdrant.
+
+Builds a throwaway collection with the index settings from the
+environment (QDRANT_HNSW_M, QDRANT_QUANTIZATION, ...; overridable
+below), fills it with synthetic clustered vectors, and compares each
+mode's top-k with a brute-force NumPy ground truth.
+
+Usage:
+    python -m benchmarks.ann_recall --vectors 100000 --queries 200 --k 10
+    python -m benchmarks.ann_recall --quantization scalar --on-disk --out ann.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import numpy as np
+
+from benchmarks.harness import git_revision, summarize
+
+
+def make_vectors(count: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Unit vectors drawn around random centroids — closer to real
+    embeddings than uniform noise (which is a worst case for HNSW).
+    """
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, size=count)
+    vectors = centroids[assignment] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def run(args) -> dict:
+    from src.core.config import settings
+    from src.services import qdrant_backend
+
+    if args.quantization:
+        settings.QDRANT_QUANTIZATION = args.quantization
+    if args.on_disk:
+        settings.QDRANT_ON_DISK_VECTORS = True
+    if args.m:
+        settings.QDRANT_HNSW_M = args.m
+    if args.ef_construct:
+        settings.QDRANT_HNSW_EF_CONSTRUCT = args.ef_construct
+
+    rng = np.random.default_rng(args.seed)
+    dim = settings.EMBEDDING_DIM
+    data = make_vectors(args.vectors, dim, args.clusters, rng)
+    queries = make_vectors(args.queries, dim, args.clusters, rng)
+    ids = [str(uuid.UUID(int=i + 1)) for i in range(args.vectors)]
+
+    # Ground truth: brute-force cosine top-k
+    truth = np.argsort(-(queries @ data.T), axis=1)[:, :args.k]
+
+    client = qdrant_backend.get_qdrant_client()
+    collection = f"ann_bench_{int(time.time())}"
+
+    try:
+        await qdrant_backend.create_versioned_collection(collection)
+
+        started = time.perf_counter()
+        await qdrant_backend.vector_upsert_batch(
+            [(ids[i], data[i].tolist(), {}) for i in range(args.vectors)],
+            batch_size=1000,
+            collection_name=collection
+        )
+
+        # Wait until the HNSW index (and quantization) is built
+        while (await client.get_collection(collection)).status != "green":
+            await asyncio.sleep(0.5)
+        build_s = time.perf_counter() - started
+
+        results = {}
+        for mode in qdrant_backend.SEARCH_MODES:
+            latencies = []
+            hits = 0
+            started = time.perf_counter()
+
+            for qi, query in enumerate(queries):
+                t0 = time.perf_counter()
+                points = await qdrant_backend.vector_search(
+                    query.tolist(), limit=args.k, mode=mode, collection_name=collection
+                )
+                latencies.append(time.perf_counter() - t0)
+
+                expected = {ids[i] for i in truth[qi]}
+                hits += len(expected & {str(p.id) for p in points})
+
+            results[mode] = summarize(
+                latencies, time.perf_counter() - started,
+                **{f"recall@{args.k}": round(hits / (args.k * len(queries)), 4)}
+            )
+            print(f"▶ {mode}: recall@{args.k} {results[mode][f'recall@{args.k}']}, "
+                  f"p50 {results[mode].get('p50_ms')} ms")
+
+        return {
+            "index": {
+                "vectors": args.vectors,
+                "dim": dim,
+                "hnsw_m": settings.QDRANT_HNSW_M,
+                "hnsw_ef_construct": settings.QDRANT_HNSW_EF_CONSTRUCT,
+                "quantization": settings.QDRANT_QUANTIZATION,
+                "on_disk_vectors": settings.QDRANT_ON_DISK_VECTORS,
+                "build_s": round(build_s, 2),
+            },
+            "modes": results,
+        }
+    finally:
+        await client.delete_collection(collection)
+        await qdrant_backend.close_qdrant_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency of the ANN search modes")
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--quantization", choices=["none", "scalar", "product"], default=None)
+    parser.add_argument("--on-disk", action="store_true", help="store original vectors on disk")
+    parser.add_argument("--m", type=int, default=None, help="HNSW m")
+    parser.add_argument("--ef-construct", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="optional JSON artifact path")
+    args = parser.parse_args()
+
+    report = {
+        "revision": git_revision(),
+        "params": vars(args),
+        "results": asyncio.run(run(args)),
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
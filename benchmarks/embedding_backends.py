@@ -0,0 +1,159 @@
+# benchmarks/embedding_backends.py
+"""
+Compare the embedding backends (torch / onnx / onnx-int8) on CPU.
+
+Two commands:
+
+parity   Encode the same texts with torch and each other backend and
+         report the per-text cosine between the two vectors. Exits
+         non-zero when any text falls below --min-cosine.
+
+latency  Per-query latency (batch of 1) and batch throughput of each
+         backend, plus model load time.
+
+Needs the real model (and onnxruntime + optimum for the ONNX backends).
+
+Usage:
+    python -m benchmarks.embedding_backends parity --backends onnx onnx-int8
+    python -m benchmarks.embedding_backends latency --backends torch onnx onnx-int8 --out emb.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.harness import git_revision, peak_rss_mb, summarize
+from benchmarks.run import WORDS, make_queries, prepare_environment
+
+
+def make_texts(count: int, rng: random.Random) -> list:
+    """
+    Product-like texts of mixed length (short queries up to long
+    descriptions).
+    """
+    return [" ".join(rng.choices(WORDS, k=rng.randint(2, 60))) for _ in range(count)]
+
+
+def load(name: str):
+    from src.core.embedding_backends import create_backend
+
+    started = time.perf_counter()
+    backend = create_backend(name)
+    return backend, time.perf_counter() - started
+
+
+# --------------------------------------
+# Commands
+# --------------------------------------
+def parity(args) -> dict:
+    texts = make_texts(args.texts, random.Random(args.seed))
+
+    reference, _ = load("torch")
+    expected = reference.encode(texts, batch_size=args.batch_size)
+
+    results = {}
+    for name in args.backends:
+        if name == "torch":
+            continue
+
+        backend, _ = load(name)
+        actual = backend.encode(texts, batch_size=args.batch_size)
+
+        # Both sides are L2-normalized → row-wise dot = cosine
+        cosine = np.einsum("ij,ij->i", expected, actual)
+        results[name] = {
+            "texts": len(texts),
+            "min_cosine": round(float(cosine.min()), 6),
+            "mean_cosine": round(float(cosine.mean()), 6),
+            "p1_cosine": round(float(np.percentile(cosine, 1)), 6),
+            "below_threshold": int((cosine < args.min_cosine).sum()),
+            "passed": bool(cosine.min() >= args.min_cosine),
+        }
+
+    return results
+
+
+def latency(args) -> dict:
+    rng = random.Random(args.seed)
+    queries = make_queries(args.queries, rng)
+    texts = make_texts(args.texts, rng)
+
+    results = {}
+    for name in args.backends:
+        backend, load_s = load(name)
+
+        # Warm up (first call allocates / JITs kernels)
+        backend.encode(queries[:8], batch_size=8)
+
+        latencies = []
+        started = time.perf_counter()
+        for query in queries:
+            t0 = time.perf_counter()
+            backend.encode([query], batch_size=1)
+            latencies.append(time.perf_counter() - t0)
+        single = summarize(latencies, time.perf_counter() - started)
+
+        throughput = {}
+        for batch_size in args.batch_sizes:
+            started = time.perf_counter()
+            backend.encode(texts, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            throughput[str(batch_size)] = round(len(texts) / elapsed, 1)
+
+        results[name] = {
+            "load_s": round(load_s, 3),
+            "single_query": single,
+            "batch_texts_per_sec": throughput,
+        }
+        print(f"▶ {name}: p50 {single.get('p50_ms')} ms/query, {throughput} texts/sec")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend parity + latency")
+    parser.add_argument("command", choices=["parity", "latency"])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=512, help="texts for parity / batch throughput")
+    parser.add_argument("--queries", type=int, default=200, help="single-query latency samples")
+    parser.add_argument("--batch-size", type=int, default=32, help="parity encode batch size")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--min-cosine", type=float, default=0.98,
+                        help="parity threshold (fp32 ONNX is ~0.9999, int8 ~0.99)")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="optional JSON artifact path")
+    args = parser.parse_args()
+
+    prepare_environment("/tmp")
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    results = parity(args) if args.command == "parity" else latency(args)
+
+    report = {
+        "revision": git_revision(),
+        "command": args.command,
+        "params": vars(args),
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Written to {args.out}")
+
+    if args.command == "parity" and not all(r["passed"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/fakes.py
+"""
+Local stand-ins for external services used by the benchmarks.
+
+- hash_encode: deterministic bag-of-words embedder (no model needed)
+- install_fake_redis: points the API and the event worker at fakeredis
+"""
+
+import asyncio
+import hashlib
+import time
+
+import numpy as np
+
+
+# --------------------------------------
+# Embedder
+# --------------------------------------
+def make_hash_encoder(dim: int):
+    """
+    Deterministic bag-of-words hashing embedder. Texts sharing
+    words get similar vectors, which is enough to exercise ranking.
+    """
+    def hash_encode(texts: list, batch_size: int = None) -> list:
+        out = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                digest = hashlib.md5(token.encode("utf-8")).digest()
+                out[row, int.from_bytes(digest[:4], "little") % dim] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (out / norms).tolist()
+
+    return hash_encode
+
+
+def install_hash_embedder(dim: int):
+    """
+    Route every embedding call through the hashing embedder.
+    """
+    import src.core.embeddings as embeddings
+
+    encoder = make_hash_encoder(dim)
+    embeddings._encode_batch = encoder
+    embeddings.embedding_executor._encode_fn = encoder
+
+
+# --------------------------------------
+# Redis
+# --------------------------------------
+def _polling_xreadgroup(client):
+    """
+    fakeredis answers a cancelled blocking XREADGROUP with an empty
+    reply instead of raising CancelledError, so the event worker could
+    not be stopped; wait by polling (cancellable sleeps) instead.
+    """
+    xreadgroup = client.xreadgroup
+
+    async def poll(groupname, consumername, streams, count=None, block=None, noack=False):
+        deadline = time.monotonic() + (block or 0) / 1000
+        while True:
+            messages = await xreadgroup(groupname, consumername, streams, count=count, noack=noack)
+            if (messages and messages[0][1]) or not block or time.monotonic() >= deadline:
+                return messages
+            await asyncio.sleep(0.005)
+
+    client.xreadgroup = poll
+    return client
+
+
+def install_fake_redis():
+    """
+    Point the shared async Redis client and the event worker at
+    one in-process fakeredis server.
+
+    Returns:
+        An async fakeredis client (decoded responses) on that server
+    """
+    import fakeredis
+    import src.core.redis_client as redis_client
+    import src.workers.event_processor as event_processor
+
+    server = fakeredis.FakeServer()
+
+    redis_client._client = fakeredis.FakeAsyncRedis(server=server)
+    event_processor.get_redis_client = lambda: _polling_xreadgroup(
+        fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    )
+
+    return fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
@@ -0,0 +1,91 @@
+# benchmarks/harness.py
+"""
+Load driver and result statistics shared by the benchmarks.
+"""
+
+import asyncio
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def summarize(latencies: list, elapsed: float, errors: int = 0, **extra) -> dict:
+    """
+    Latency percentiles (ms) + throughput for one scenario.
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+    if len(values):
+        result.update({
+            "mean_ms": round(float(values.mean()), 3),
+            "p50_ms": round(float(np.percentile(values, 50)), 3),
+            "p95_ms": round(float(np.percentile(values, 95)), 3),
+            "p99_ms": round(float(np.percentile(values, 99)), 3),
+            "max_ms": round(float(values.max()), 3),
+        })
+
+    result.update(extra)
+    return result
+
+
+async def drive(make_call, total: int, concurrency: int) -> dict:
+    """
+    Run `make_call(i)` for i in range(total) with `concurrency`
+    callers in flight, timing each call.
+
+    `make_call` returns an awaitable; an exception or an HTTP
+    response with status >= 400 counts as an error.
+    """
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def caller():
+        nonlocal next_index, errors
+        while next_index < total:
+            i = next_index
+            next_index += 1
+
+            started = time.perf_counter()
+            try:
+                response = await make_call(i)
+                if getattr(response, "status_code", 200) >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[caller() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed, errors, concurrency=concurrency)
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
@@ -0,0 +1,333 @@
+# benchmarks/run.py
+"""
+End-to-end benchmark of the API and the event worker.
+
+Runs without Postgres, Qdrant or Redis:
+- SQLite (aiosqlite) behind AsyncSessionLocal
+- the in-process NumPy vector backend (VECTOR_BACKEND=numpy)
+- fakeredis behind the event stream
+
+Scenarios:
+1. POST /api/v1/products/ingest/json   (batched catalog push)
+   POST /api/v1/products/ingest/stream (NDJSON upload, --stream-products)
+2. GET  /api/v1/search/                (hybrid search, with and without filters,
+                                        and during a heavy streaming ingest)
+3. GET  /api/v1/search/semantic        (vector + keyword search)
+4. POST /api/v1/events/batch           (event beacons, --event-batch per request)
+5. event_worker draining the Redis stream
+
+Writes p50/p95/p99 latency, throughput and peak RSS as JSON.
+
+Usage:
+    python -m benchmarks.run --products 2000 --requests 500 --concurrency 16 --out bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.harness import drive, git_revision, peak_rss_mb
+
+
+CATEGORIES = ["shoes", "bags", "watches", "jackets", "headphones", "laptops", "phones", "toys"]
+
+WORDS = [
+    "running", "lightweight", "leather", "wireless", "waterproof", "classic", "premium",
+    "sport", "casual", "travel", "noise", "cancelling", "smart", "vintage", "compact",
+    "durable", "soft", "cushioned", "gaming", "kids", "outdoor", "winter", "summer",
+    "black", "white", "red", "blue", "slim", "pro", "mini", "ultra", "eco",
+]
+
+
+# --------------------------------------
+# Environment + data
+# --------------------------------------
+def prepare_environment(workdir: str):
+    """
+    Must run before anything under `src` is imported.
+    """
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{workdir}/bench.db"
+
+    for key, value in {
+        "POSTGRES_HOST": "localhost",
+        "POSTGRES_PORT": "5432",
+        "POSTGRES_DB": "bench",
+        "POSTGRES_USER": "bench",
+        "POSTGRES_PASSWORD": "bench",
+        "REDIS_HOST": "localhost",
+        "REDIS_PORT": "6379",
+        "QDRANT_HOST": "localhost",
+        "QDRANT_PORT": "6333",
+        "EVENT_WORKER_METRICS_PORT": "0",
+        "VECTOR_BACKEND": "numpy",
+        "VECTOR_NUMPY_PATH": "",
+        # numpy cannot receive the worker's payload pushes → rank from Postgres
+        "SEARCH_RANK_FROM_PAYLOAD": "false",
+    }.items():
+        os.environ.setdefault(key, value)
+
+
+def make_products(count: int, rng: random.Random) -> list:
+    return [
+        {
+            "title": " ".join(rng.sample(WORDS, 3)) + f" {rng.choice(CATEGORIES)}",
+            "description": " ".join(rng.sample(WORDS, 8)),
+            "category": rng.choice(CATEGORIES),
+            "price": round(rng.uniform(5, 500), 2),
+            "rating": round(rng.uniform(1, 5), 1),
+            "attributes": {"sku": i},
+        }
+        for i in range(count)
+    ]
+
+
+def make_queries(count: int, rng: random.Random) -> list:
+    return [
+        " ".join(rng.sample(WORDS, rng.randint(1, 3))) + f" {rng.choice(CATEGORIES)}"
+        for _ in range(count)
+    ]
+
+
+def make_events(count: int, product_ids: list, rng: random.Random) -> list:
+    event_types = ["click"] * 6 + ["add_to_cart"] * 2 + ["purchase", "dwell", "bounce"]
+
+    events = []
+    for i in range(count):
+        event_type = rng.choice(event_types)
+        events.append({
+            "id": f"bench-{i}",
+            "user_id": f"user-{rng.randint(0, 999)}",
+            "session_id": f"session-{rng.randint(0, 9999)}",
+            "event_type": event_type,
+            "product_id": rng.choice(product_ids),
+            "metadata": {"seconds": rng.randint(1, 120)} if event_type == "dwell" else None,
+        })
+    return events
+
+
+# --------------------------------------
+# Scenarios
+# --------------------------------------
+async def bench_event_worker(events: list, timeout: float) -> dict:
+    """
+    Time the worker until every event already queued on the stream
+    (by the events API scenario) is persisted.
+    """
+    from sqlalchemy import func, select
+    from src.core.database import AsyncSessionLocal
+    from src.models.event import UserEvent
+    from src.workers.event_processor import event_worker
+
+    async def persisted() -> int:
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(func.count(UserEvent.id)))).scalar_one()
+
+    baseline = await persisted()
+
+    started = time.perf_counter()
+    worker = asyncio.create_task(event_worker())
+
+    processed = 0
+    while time.perf_counter() - started < timeout:
+        processed = await persisted() - baseline
+        if processed >= len(events) or worker.done():
+            break
+        await asyncio.sleep(0.05)
+
+    elapsed = time.perf_counter() - started
+
+    worker.cancel()
+    try:
+        await worker
+    except (asyncio.CancelledError, Exception):
+        pass
+
+    return {
+        "events": len(events),
+        "processed": processed,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_eps": round(processed / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import select
+
+    from src.core.config import settings
+    from src.core.database import AsyncSessionLocal, engine, init_db, read_engine
+    from src.main import app
+    from src.models.product import Product
+
+    from benchmarks.fakes import install_fake_redis, install_hash_embedder
+
+    # Keep SQL logging out of the measurement
+    engine.echo = False
+    read_engine.echo = False
+
+    if args.embedder == "hash":
+        install_hash_embedder(settings.EMBEDDING_DIM)
+    install_fake_redis()
+
+    await init_db()
+
+    rng = random.Random(args.seed)
+    products = make_products(args.products, rng)
+    queries = make_queries(max(args.requests, 1), rng)
+    batches = [
+        products[i:i + args.ingest_batch]
+        for i in range(0, len(products), args.ingest_batch)
+    ]
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        print(f"▶ ingest: {len(products)} products in {len(batches)} requests")
+        started = time.perf_counter()
+        results["ingest"] = await drive(
+            lambda i: client.post("/api/v1/products/ingest/json", json=batches[i]),
+            len(batches), args.ingest_concurrency
+        )
+        elapsed = time.perf_counter() - started
+        results["ingest"]["products_per_sec"] = round(len(products) / elapsed, 2) if elapsed > 0 else None
+
+        if args.stream_products:
+            print(f"▶ ingest_stream: {args.stream_products} products as NDJSON")
+            body = "\n".join(json.dumps(p) for p in make_products(args.stream_products, rng)).encode()
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/products/ingest/stream",
+                content=body,
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+            summary = response.json()
+            results["ingest_stream"] = {
+                "status": response.status_code,
+                "count": summary.get("count"),
+                "invalid": summary.get("invalid"),
+                "elapsed_s": round(time.perf_counter() - started, 4),
+                "stages": summary.get("stages"),
+            }
+
+        print(f"▶ search: {args.requests} requests @ concurrency {args.concurrency}")
+        results["search"] = await drive(
+            lambda i: client.get("/api/v1/search/", params={"q": queries[i]}),
+            args.requests, args.concurrency
+        )
+
+        print(f"▶ search (filtered): {args.requests} requests @ concurrency {args.concurrency}")
+        results["search_filtered"] = await drive(
+            lambda i: client.get("/api/v1/search/", params={
+                "q": queries[i],
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "price_max": 250,
+                "rating_min": 3,
+            }),
+            args.requests, args.concurrency
+        )
+
+        if args.mixed_products:
+            print(f"▶ search during ingest: {args.requests} requests while "
+                  f"{args.mixed_products} products stream in")
+            body = "\n".join(json.dumps(p) for p in make_products(args.mixed_products, rng)).encode()
+            # Fresh queries → measured against the database, not the response cache
+            mixed_queries = make_queries(max(args.requests, 1), rng)
+
+            started = time.perf_counter()
+            ingest = asyncio.create_task(client.post(
+                "/api/v1/products/ingest/stream",
+                content=body,
+                headers={"Content-Type": "application/x-ndjson"}
+            ))
+            results["search_during_ingest"] = await drive(
+                lambda i: client.get("/api/v1/search/", params={"q": mixed_queries[i]}),
+                args.requests, args.concurrency
+            )
+            response = await ingest
+            results["search_during_ingest"]["ingest_status"] = response.status_code
+            results["search_during_ingest"]["ingest_s"] = round(time.perf_counter() - started, 4)
+
+        print(f"▶ semantic: {args.requests} requests @ concurrency {args.concurrency}")
+        results["semantic"] = await drive(
+            lambda i: client.get("/api/v1/search/semantic", params={"q": queries[i], "limit": 10}),
+            args.requests, args.concurrency
+        )
+
+    async with AsyncSessionLocal() as db:
+        product_ids = list((await db.execute(select(Product.id))).scalars().all())
+
+    if args.events and product_ids:
+        events = make_events(args.events, product_ids, rng)
+        event_batches = [
+            events[i:i + args.event_batch]
+            for i in range(0, len(events), args.event_batch)
+        ]
+
+        print(f"▶ events: {len(events)} events in {len(event_batches)} batch requests")
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            started = time.perf_counter()
+            results["events_batch"] = await drive(
+                lambda i: client.post("/api/v1/events/batch", json=event_batches[i]),
+                len(event_batches), args.concurrency
+            )
+            elapsed = time.perf_counter() - started
+            results["events_batch"]["events_per_sec"] = round(len(events) / elapsed, 2) if elapsed > 0 else None
+
+        print(f"▶ event_worker: {args.events} events")
+        results["event_worker"] = await bench_event_worker(events, args.worker_timeout)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end search platform benchmark")
+    parser.add_argument("--products", type=int, default=2000, help="catalog size")
+    parser.add_argument("--ingest-batch", type=int, default=200, help="products per ingest request")
+    parser.add_argument("--ingest-concurrency", type=int, default=1)
+    parser.add_argument("--stream-products", type=int, default=2000,
+                        help="products sent through the streaming endpoint (0 = skip)")
+    parser.add_argument("--requests", type=int, default=500, help="requests per search scenario")
+    parser.add_argument("--mixed-products", type=int, default=5000,
+                        help="products streamed in while searching (0 = skip the mixed scenario)")
+    parser.add_argument("--concurrency", type=int, default=16, help="search requests in flight")
+    parser.add_argument("--events", type=int, default=20000, help="events for the worker scenario (0 = skip)")
+    parser.add_argument("--event-batch", type=int, default=50, help="events per POST /events/batch")
+    parser.add_argument("--worker-timeout", type=float, default=120.0)
+    parser.add_argument("--embedder", choices=["hash", "model"], default="hash",
+                        help="hash = deterministic stand-in, model = real embedding model")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=None, help="directory for the SQLite file (default: temp dir)")
+    parser.add_argument("--out", default="bench_output.json", help="JSON artifact path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepare_environment(args.workdir or tmp)
+
+        started = time.perf_counter()
+        results = asyncio.run(run(args))
+
+        report = {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "params": vars(args),
+            "results": results,
+            "total_s": round(time.perf_counter() - started, 2),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    print(f"📄 Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# benchmarks/vector_backends.py
+"""
+NumPy vs Qdrant vector backend at growing index sizes.
+
+For each size (default 10k, 100k, 1M) and backend:
+- build time (upsert every vector)
+- single-query latency, unfiltered and with a category filter
+- batch query throughput (NumPy: one matrix product per batch;
+  Qdrant: one query_batch_points request)
+- recall@k against a NumPy brute-force ground truth
+- NumPy only: persist / memory-mapped load time
+
+Qdrant runs are skipped with --no-qdrant (or when it is unreachable).
+Vectors are synthetic and clustered (see benchmarks.ann_recall).
+
+Usage:
+    python -m benchmarks.vector_backends --sizes 10000 100000 1000000 --out vectors.json
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from benchmarks.ann_recall import make_vectors
+from benchmarks.harness import git_revision, peak_rss_mb, summarize
+from benchmarks.run import CATEGORIES, prepare_environment
+
+
+async def bench_backend(backend, name: str, data, payloads, queries, truth, args) -> dict:
+    from src.models.schemas import SearchFilters
+
+    ids = [str(uuid.UUID(int=i + 1)) for i in range(len(data))]
+    collection = f"bench_{name}_{len(data)}_{int(time.time())}"
+    result = {}
+
+    await backend.create_versioned_collection(collection)
+    try:
+        started = time.perf_counter()
+        for start in range(0, len(data), args.upsert_batch):
+            end = start + args.upsert_batch
+            await backend.vector_upsert_batch(
+                [(ids[i], data[i], payloads[i]) for i in range(start, min(end, len(data)))],
+                batch_size=args.upsert_batch,
+                collection_name=collection
+            )
+        if name == "qdrant":
+            client = backend.get_qdrant_client()
+            while (await client.get_collection(collection)).status != "green":
+                await asyncio.sleep(0.5)
+        result["build_s"] = round(time.perf_counter() - started, 3)
+
+        for label, filters in (
+            ("single", None),
+            ("single_filtered", SearchFilters(category=CATEGORIES[0])),
+        ):
+            latencies = []
+            hits = 0
+            started = time.perf_counter()
+            for qi, query in enumerate(queries):
+                t0 = time.perf_counter()
+                points = await backend.vector_search(
+                    query, limit=args.k, filters=filters, mode="balanced", collection_name=collection
+                )
+                latencies.append(time.perf_counter() - t0)
+                if filters is None:
+                    hits += len({ids[i] for i in truth[qi]} & {str(p.id) for p in points})
+
+            extra = {f"recall@{args.k}": round(hits / (args.k * len(queries)), 4)} if filters is None else {}
+            result[label] = summarize(latencies, time.perf_counter() - started, **extra)
+
+        started = time.perf_counter()
+        for start in range(0, len(queries), args.query_batch):
+            await backend.vector_search_batch(
+                queries[start:start + args.query_batch], limit=args.k, mode="balanced", collection_name=collection
+            )
+        elapsed = time.perf_counter() - started
+        result["batch_queries_per_sec"] = round(len(queries) / elapsed, 1)
+
+        if name == "numpy":
+            index = backend._collections[collection]
+            result["index_mb"] = round(index._vectors[:index.size].nbytes / 2 ** 20, 1)
+
+            with tempfile.TemporaryDirectory() as tmp:
+                started = time.perf_counter()
+                index.save(tmp)
+                result["persist_s"] = round(time.perf_counter() - started, 3)
+
+                started = time.perf_counter()
+                loaded = backend.NumpyVectorIndex.load(tmp, mmap=True)
+                result["mmap_load_s"] = round(time.perf_counter() - started, 3)
+
+                t0 = time.perf_counter()
+                loaded.search(queries[0], args.k)
+                result["first_query_after_load_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+                del loaded
+    finally:
+        await backend.delete_collection(collection)
+
+    return result
+
+
+async def run(args) -> dict:
+    from src.core.config import settings
+    from src.services import numpy_backend
+
+    backends = {"numpy": numpy_backend}
+
+    if not args.no_qdrant:
+        from src.services import qdrant_backend
+        if await _qdrant_reachable(qdrant_backend):
+            backends["qdrant"] = qdrant_backend
+        else:
+            print("⚠️ Qdrant unreachable — skipping it")
+
+    rng = np.random.default_rng(args.seed)
+    results = {}
+
+    try:
+        for size in args.sizes:
+            data = make_vectors(size, settings.EMBEDDING_DIM, args.clusters, rng)
+            queries = make_vectors(args.queries, settings.EMBEDDING_DIM, args.clusters, rng)
+            payloads = [{"category": CATEGORIES[i % len(CATEGORIES)], "price": float(i % 500)} for i in range(size)]
+
+            # Ground truth in chunks (bounded memory at 1M)
+            truth = np.concatenate([
+                np.argsort(-(queries[i:i + 16] @ data.T), axis=1)[:, :args.k]
+                for i in range(0, len(queries), 16)
+            ])
+
+            results[str(size)] = {}
+            for name, backend in backends.items():
+                print(f"▶ {name}: {size} vectors")
+                results[str(size)][name] = await bench_backend(backend, name, data, payloads, queries, truth, args)
+    finally:
+        if "qdrant" in backends:
+            await backends["qdrant"].close_vector_store()
+
+    return results
+
+
+async def _qdrant_reachable(qdrant_backend) -> bool:
+    try:
+        await qdrant_backend.get_qdrant_client().get_collections()
+        return True
+    except Exception:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NumPy vs Qdrant vector backend scaling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--query-batch", type=int, default=32)
+    parser.add_argument("--upsert-batch", type=int, default=1000)
+    parser.add_argument("--clusters", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--no-qdrant", action="store_true", help="benchmark the NumPy backend only")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="optional JSON artifact path")
+    args = parser.parse_args()
+
+    prepare_environment(tempfile.gettempdir())
+
+    report = {
+        "revision": git_revision(),
+        "params": vars(args),
+        "results": asyncio.run(run(args)),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,12 @@ from src.core.config import settings
 client = QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
 
 print("\n=== COLLECTION INFO ===")
-info = client.get_collection("products_collection")
+info = client.get_collection(settings.QDRANT_COLLECTION_ALIAS)
 print(info)
 
 print("\n=== LIST ALL POINT IDS ===")
 points = client.scroll(
-    collection_name="products_collection",
+    collection_name=settings.QDRANT_COLLECTION_ALIAS,
     limit=50,
     with_payload=True,
     with_vectors=False
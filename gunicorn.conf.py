@@ -0,0 +1,55 @@
+# gunicorn.conf.py
+"""
+Multi-worker deployment with a shared embedding model.
+
+    EMBEDDING_PRELOAD=true gunicorn src.main:app -c gunicorn.conf.py
+
+preload_app imports src.main in the master, which (with
+EMBEDDING_PRELOAD) loads the model once before forking. Workers
+inherit the weights copy-on-write instead of each loading a copy;
+the warmup pass then runs per worker in the app lifespan.
+
+Set PROMETHEUS_MULTIPROC_DIR (an empty, writable directory) so
+/metrics aggregates the histograms of every worker.
+
+VECTOR_BACKEND=numpy keeps the index inside the worker process, so it
+refuses to start with more than one worker (WEB_CONCURRENCY=1).
+"""
+
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app (and load the model) before forking workers
+preload_app = True
+
+# Model load + lifespan can take a while on a cold cache
+timeout = 120
+
+
+def on_starting(server):
+    from src.core.config import settings
+
+    # Each worker would hold (and persist) its own diverging copy
+    if settings.VECTOR_BACKEND == "numpy" and server.cfg.workers > 1:
+        raise RuntimeError(
+            f"VECTOR_BACKEND=numpy needs a single worker, got {server.cfg.workers}. "
+            "Set WEB_CONCURRENCY=1 or use VECTOR_BACKEND=qdrant."
+        )
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far (model objects included) out of
+    # the GC's reach, so collections in the workers do not touch those
+    # pages and break copy-on-write sharing
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live metric files (multiprocess mode)
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
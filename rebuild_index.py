@@ -1,12 +1,37 @@
-from qdrant_client import QdrantClient
+"""
+Blue/green rebuild of the product vector index.
 
-client = QdrantClient(host="localhost", port=6333)
+Streams every product from Postgres into a new versioned vector
+collection, then atomically swaps the live alias to it.
 
-client.update_collection(
-    collection_name="products_collection",
-    optimizer_config={
-        "default_segment_number": 1
-    }
-)
+Usage:
+    python rebuild_index.py [--batch-size 512] [--keep-old]
+"""
 
-print("Index rebuild triggered!")
+import argparse
+import asyncio
+
+from src.services.reindex_service import ReindexService
+from src.services.vector_service import close_vector_store
+
+
+async def main(batch_size: int, keep_old: bool):
+    try:
+        summary = await ReindexService.rebuild(
+            batch_size=batch_size,
+            drop_old=False if keep_old else None
+        )
+    finally:
+        # Qdrant: closes the client. NumPy: persists the new index.
+        await close_vector_store()
+
+    print("Index rebuild complete!", summary)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the product vector index")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--keep-old", action="store_true", help="Keep the previous collection")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.batch_size, args.keep_old))
@@ -1,16 +1,49 @@
 # src/api/routes/events.py
+"""
+User event ingestion (clicks, carts, purchases, dwell, bounces).
 
-from fastapi import APIRouter
+Events are queued on a Redis stream and applied to products by the
+event worker. Client SDKs should prefer the batch endpoint: all
+events of a page view in one request and one Redis round trip.
+"""
+
+from fastapi import APIRouter, HTTPException
+from redis.exceptions import RedisError
+
+from src.core.config import settings
 from src.models.schemas import EventIn
 from src.services.event_service import EventService
-import uuid
 
-router = APIRouter()
+router = APIRouter()   # No prefix here; prefix applied in main.py
+
 
 @router.post("/")
 async def push_event(event: EventIn):
-    event_dict = event.dict()
-    event_dict["id"] = str(uuid.uuid4())
+    event_dict = event.model_dump()
+
+    try:
+        await EventService.push_event(event_dict)
+    except RedisError as e:
+        raise HTTPException(status_code=503, detail=f"Event queue unavailable: {e}")
 
-    EventService.push_event(event_dict)
     return {"status": "queued", "event": event_dict}
+
+
+@router.post("/batch")
+async def push_events(events: list[EventIn]):
+    """
+    Queue an array of events with one pipelined XADD round trip.
+    At most EVENT_BATCH_MAX_EVENTS events per request.
+    """
+    if len(events) > settings.EVENT_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.EVENT_BATCH_MAX_EVENTS} events per batch"
+        )
+
+    try:
+        stream_ids = await EventService.push_events([event.model_dump() for event in events])
+    except RedisError as e:
+        raise HTTPException(status_code=503, detail=f"Event queue unavailable: {e}")
+
+    return {"status": "queued", "count": len(stream_ids)}
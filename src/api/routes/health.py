@@ -0,0 +1,39 @@
+# src/api/routes/health.py
+"""
+Liveness and readiness probes.
+
+/health  → the process is up and serving HTTP
+/ready   → the embedding model is loaded + warmed up and the vector
+           store answers, so search requests will not stall
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.core.embeddings import is_model_ready
+from src.services.vector_service import vector_store_ready
+
+router = APIRouter()
+
+
+@router.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Returns 200 when every dependency is ready, 503 otherwise
+    (with the per-check breakdown in both cases).
+    """
+    checks = {
+        "model": is_model_ready(),
+        "vector_store": await vector_store_ready(),
+    }
+    ready = all(checks.values())
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "checks": checks}
+    )
@@ -0,0 +1,20 @@
+# src/api/routes/metrics.py
+"""
+Prometheus scrape endpoint.
+
+Exposes the per-stage latency histograms (search, semantic,
+ingest) and the HTTP request histogram of this process, or of
+every worker when PROMETHEUS_MULTIPROC_DIR is set.
+"""
+
+from fastapi import APIRouter, Response
+
+from src.core.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -2,18 +2,20 @@
 """
 Product ingestion endpoints.
 
-This module exposes the API route used to ingest product
-data in bulk from JSON input. It stores the products in
-PostgreSQL and then indexes them in Qdrant for semantic search.
+This module exposes the API routes used to ingest product
+data in bulk from JSON input, or as a streamed NDJSON / CSV
+upload. It stores the products in PostgreSQL and then indexes
+them in Qdrant for semantic search.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from src.core.database import get_db
 from src.models.schemas import ProductIn
 from src.services.ingestion_service import IngestionService
+from src.services.embedding_store import embedding_store
 
 router = APIRouter()
 
@@ -34,3 +36,54 @@ async def ingest_products(
     """
     result = await IngestionService.ingest_products(products, db)
     return result
+
+
+# Content types accepted by the streaming endpoint → input format
+STREAM_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-seq": "ndjson",
+    "text/csv": "csv",
+}
+
+
+@router.post("/ingest/stream")
+async def ingest_products_stream(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ingest a large NDJSON or CSV upload.
+
+    The body is read as a stream and processed in batches, so the
+    upload never has to fit in memory. The format is taken from the
+    `format` query parameter, or else from the Content-Type header.
+
+    Flow:
+    1. Parse + validate lines into batches (invalid lines are counted and skipped).
+    2. Save each batch to PostgreSQL.
+    3. Generate embeddings for the batch.
+    4. Index the batch in Qdrant.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        format = STREAM_CONTENT_TYPES.get(content_type)
+
+    if format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send application/x-ndjson or text/csv, or pass ?format=ndjson|csv"
+        )
+
+    result = await IngestionService.ingest_stream(request.stream(), format, db)
+    return result
+
+
+@router.get("/stats/embedding-store")
+async def embedding_store_stats():
+    """
+    Hit / miss counters of the content-hash embedding store for
+    this worker process (hits = texts not sent to the model).
+    """
+    return embedding_store.stats()
@@ -7,47 +7,77 @@ This module exposes:
 2. Raw semantic search directly using query embeddings on Qdrant.
 """
 
-from fastapi import APIRouter, Depends
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import get_db
+from src.core.database import get_read_db
 from src.services.search_service import SearchService
 from src.services.vector_service import vector_search
-from src.core.embeddings import generate_local_embedding
+from src.core.embeddings import get_query_embedding, embedding_executor
+from src.core.embedding_cache import embedding_cache
+from src.services.result_cache import search_result_cache
+from src.services.search_snapshot import InvalidCursor, search_snapshots
+from src.services.product_cache import product_cache
 
 router = APIRouter()   # No prefix here; prefix applied in main.py
 
 
 # ------------------------------------------------------------
-# 1) HYBRID SEARCH (DB filtering + vector ranking)
+# 1) HYBRID SEARCH (filtered vector search + behavioral ranking)
 # ------------------------------------------------------------
 @router.get("/")
 async def search(
-    q: str,
+    response: Response,
+    q: Optional[str] = None,
     category: str = None,
     price_min: float = None,
     price_max: float = None,
     rating_min: float = None,
-    db: AsyncSession = Depends(get_db)
+    mode: Literal["exact", "fast", "balanced"] = None,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Performs hybrid product search.
 
     Steps:
-    1. Embedding → Qdrant vector search.
+    1. Embedding → Qdrant vector search, with filters
+       (category, price, rating) applied inside Qdrant.
     2. Get matching product IDs.
     3. Fetch corresponding rows from DB.
-    4. Apply filters (category, price, rating).
-    5. Apply behavioral + semantic ranking.
+    4. Apply behavioral + semantic ranking.
+
+    `mode` trades recall for latency: exact (brute force), fast
+    (small HNSW beam) or balanced (default, wider beam + rescoring).
+
+    Pagination: the response carries an `X-Next-Cursor` header while
+    more results exist. Pass it back as `cursor` (q / filters are
+    then taken from the cursor) to get the next `limit` results.
     """
-    results = await SearchService.search(
-        db=db,
-        query=q,
-        category=category,
-        price_min=price_min,
-        price_max=price_max,
-        rating_min=rating_min,
-    )
+    if q is None and cursor is None:
+        raise HTTPException(status_code=422, detail="Either q or cursor is required")
+
+    try:
+        results, next_cursor = await SearchService.search_page(
+            db=db,
+            query=q,
+            category=category,
+            price_min=price_min,
+            price_max=price_max,
+            rating_min=rating_min,
+            limit=limit,
+            mode=mode,
+            cursor=cursor,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     return results
 
 
@@ -55,7 +85,11 @@ async def search(
 # 2) PURE SEMANTIC SEARCH (for testing / debugging)
 # ------------------------------------------------------------
 @router.post("/semantic")
-async def semantic_search(query: str, limit: int = 5):
+async def semantic_search(
+    query: str,
+    limit: int = 5,
+    mode: Literal["exact", "fast", "balanced"] = None
+):
     """
     Direct semantic search without DB involvement.
 
@@ -64,9 +98,69 @@ async def semantic_search(query: str, limit: int = 5):
     - Verifying Qdrant vector results
 
     Steps:
-    1. Convert query text → embedding.
+    1. Convert query text → embedding (cached).
     2. Run vector search against Qdrant.
     """
-    vector = await generate_local_embedding(query)
-    results = await vector_search(vector, limit)
+    vector = await get_query_embedding(query)
+    results = await vector_search(vector, limit, mode=mode)
     return results
+
+
+# ------------------------------------------------------------
+# 3) EMBEDDING CACHE STATS
+# ------------------------------------------------------------
+@router.get("/stats/embedding-cache")
+async def embedding_cache_stats():
+    """
+    Hit / miss / eviction counters of the query embedding cache
+    for this worker process.
+    """
+    return embedding_cache.stats()
+
+
+# ------------------------------------------------------------
+# 4) EMBEDDING EXECUTOR STATS
+# ------------------------------------------------------------
+@router.get("/stats/embedding-executor")
+async def embedding_executor_stats():
+    """
+    Queue depth and batch-size metrics of the micro-batching
+    embedding executor for this worker process.
+    """
+    return embedding_executor.stats()
+
+
+# ------------------------------------------------------------
+# 5) SEARCH RESPONSE CACHE STATS
+# ------------------------------------------------------------
+@router.get("/stats/search-cache")
+async def search_cache_stats():
+    """
+    Hit / miss counters and current version stamps of the
+    search response cache for this worker process.
+    """
+    return search_result_cache.stats()
+
+
+# ------------------------------------------------------------
+# 6) PAGINATION SNAPSHOT STATS
+# ------------------------------------------------------------
+@router.get("/stats/search-snapshots")
+async def search_snapshot_stats():
+    """
+    Snapshot saves / page reads / expirations of cursor
+    pagination for this worker process.
+    """
+    return search_snapshots.stats()
+
+
+# ------------------------------------------------------------
+# 7) PRODUCT METADATA CACHE STATS
+# ------------------------------------------------------------
+@router.get("/stats/product-cache")
+async def product_cache_stats():
+    """
+    Hit / miss / invalidation counters of the product metadata
+    cache used to hydrate search candidates, for this worker process.
+    """
+    return product_cache.stats()
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Query, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.services.semantic_service import SemanticService
-from src.core.database import get_db
+from src.core.database import get_read_db
 
 router = APIRouter()   # ✅ You forgot this earlier
 
@@ -12,6 +12,6 @@ router = APIRouter()   # ✅ You forgot this earlier
 async def semantic_search(
     q: str = Query(..., description="Search query"),
     limit: int = 10,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     return await SemanticService.search(q, limit, db)
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,24 +10,162 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    DATABASE_URL: Optional[str] = None     # full SQLAlchemy URL, overrides POSTGRES_*
+    SQL_ECHO: bool = False                 # log every SQL statement (debug only)
+    READ_DATABASE_URL: Optional[str] = None  # read replica for search (default: the primary)
+
+    # -----------------------
+    # DATABASE POOLS (per process)
+    # -----------------------
+    DB_POOL_SIZE: int = 10                 # primary: ingestion, worker, reindex
+    DB_MAX_OVERFLOW: int = 10              # extra connections above the pool size under burst
+    DB_READ_POOL_SIZE: int = 20            # read engine: search + semantic routes
+    DB_READ_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30    # wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800    # reconnect older connections (LB / server timeouts)
+    DB_POOL_PRE_PING: bool = True          # check a connection on checkout (drops dead ones)
+    DB_STATEMENT_CACHE_SIZE: int = 100     # asyncpg prepared statements per connection (0 behind PgBouncer)
 
     # -----------------------
     # REDIS
     # -----------------------
     REDIS_HOST: str
     REDIS_PORT: int
+    REDIS_MAX_CONNECTIONS: int = 50        # shared async pool size per process
+
+    # -----------------------
+    # VECTOR STORE
+    # -----------------------
+    VECTOR_BACKEND: str = "qdrant"                  # qdrant | numpy (in-process)
+    VECTOR_NUMPY_PATH: str = "data/vector_index"    # numpy: persisted index directory ("" = memory only)
+    VECTOR_NUMPY_MMAP: bool = True                  # numpy: memory-map the persisted matrix
 
     # -----------------------
     # QDRANT
     # -----------------------
     QDRANT_HOST: str
     QDRANT_PORT: int
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = False      # use gRPC transport instead of REST
+    QDRANT_POOL_SIZE: int = 100           # max pooled connections per process
+    QDRANT_TIMEOUT: int = 10              # seconds
+    QDRANT_COLLECTION_ALIAS: str = "products"   # live alias → versioned collection
+
+    # -----------------------
+    # QDRANT INDEX (applied when a collection is created)
+    # -----------------------
+    QDRANT_HNSW_M: int = 16                 # graph degree (recall ↑, RAM ↑)
+    QDRANT_HNSW_EF_CONSTRUCT: int = 100     # build-time beam width
+    QDRANT_ON_DISK_VECTORS: bool = False    # keep original vectors on disk (mmap)
+    QDRANT_QUANTIZATION: str = "none"       # none | scalar | product
+    QDRANT_PQ_COMPRESSION: str = "x16"      # product quantization: x4 | x8 | x16 | x32 | x64
+    QDRANT_QUANTIZATION_ALWAYS_RAM: bool = True   # pin quantized vectors in RAM
+
+    # -----------------------
+    # SEARCH MODES (per request: exact | fast | balanced)
+    # -----------------------
+    SEARCH_MODE_DEFAULT: str = "balanced"
+    SEARCH_HNSW_EF_FAST: int = 32           # small beam, quantized scores only
+    SEARCH_HNSW_EF_BALANCED: int = 128      # wider beam + rescoring
+    SEARCH_RESCORE_OVERSAMPLING: float = 2.0   # candidates fetched per result before rescoring
+
+    # -----------------------
+    # REINDEX (blue/green)
+    # -----------------------
+    REINDEX_BATCH_SIZE: int = 512          # products streamed per batch
+    REINDEX_DROP_OLD: bool = True          # delete previous collection after swap
 
     # -----------------------
     # LOCAL EMBEDDINGS
     # -----------------------
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     EMBEDDING_DIM: int = 384
+    EMBEDDING_BACKEND: str = "torch"          # torch | onnx | onnx-int8
+    EMBEDDING_ONNX_DIR: str = "models/onnx"   # cached ONNX exports
+    EMBEDDING_MAX_SEQ_LENGTH: int = 256       # tokens per text (truncation)
+    EMBEDDING_PRELOAD: bool = False           # load at app import (gunicorn preload_app → shared weights)
+    EMBEDDING_WARMUP: bool = True             # warmup forward pass at startup
+
+    # -----------------------
+    # EMBEDDING EXECUTOR (micro-batching)
+    # -----------------------
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0   # wait this long for more queries
+    EMBEDDING_MAX_BATCH_SIZE: int = 32       # flush early once this many queued
+    EMBEDDING_EXECUTOR_WORKERS: int = 1      # batches encoding concurrently
+    EMBEDDING_INGEST_WORKERS: int = 1        # bulk (ingest) encodes, on their own threads
+
+    # -----------------------
+    # QUERY EMBEDDING CACHE
+    # -----------------------
+    EMBEDDING_CACHE_SIZE: int = 10000             # in-process LRU entries
+    EMBEDDING_CACHE_TTL_SECONDS: float = 3600     # in-process entry lifetime
+    EMBEDDING_CACHE_REDIS_ENABLED: bool = False   # shared tier across workers
+    EMBEDDING_CACHE_REDIS_TTL_SECONDS: int = 86400
+
+    # -----------------------
+    # BEHAVIOR SIGNALS
+    # -----------------------
+    BEHAVIOR_PAYLOAD_FLUSH_SECONDS: float = 5.0   # max staleness of behavior_score in Qdrant
+    BEHAVIOR_VERSION_MIN_INTERVAL_SECONDS: float = 60.0   # min gap between search-cache invalidations by behavior
+    SEARCH_RANK_FROM_PAYLOAD: bool = True          # rank from vector payload, skip Postgres
+    SEARCH_CANDIDATE_POOL: int = 100               # vector hits re-ranked per search
+    BEHAVIOR_HALF_LIFE_HOURS: float = 72.0         # an event's weight halves every this many hours
+    BEHAVIOR_BUCKET_RETENTION_HOURS: int = 720     # hourly aggregates kept (30 days)
+    BEHAVIOR_BUCKET_PRUNE_INTERVAL_SECONDS: float = 3600
+
+    # -----------------------
+    # SEARCH RESPONSE CACHE
+    # -----------------------
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_SIZE: int = 5000                 # in-process front layer entries
+    SEARCH_CACHE_TTL_SECONDS: float = 300         # entry lifetime (both tiers)
+    SEARCH_CACHE_VERSION_CHECK_SECONDS: float = 1.0   # max staleness after a version bump
+    SEARCH_CACHE_REDIS_ENABLED: bool = True
+
+    # -----------------------
+    # PRODUCT METADATA CACHE (search hydration)
+    # -----------------------
+    PRODUCT_CACHE_ENABLED: bool = True
+    PRODUCT_CACHE_SIZE: int = 50000               # in-process entries (one per product)
+    PRODUCT_CACHE_TTL_SECONDS: float = 600        # staleness bound if an invalidation is missed
+    PRODUCT_CACHE_REPLICA_LAG_SECONDS: float = 5  # with READ_DATABASE_URL: don't re-cache an id this long after invalidation
+
+    # -----------------------
+    # SEARCH PAGINATION (cursor snapshots)
+    # -----------------------
+    SEARCH_PAGINATION_DEPTH: int = 100            # ranked results reachable through cursors
+    SEARCH_SNAPSHOT_TTL_SECONDS: int = 600        # ranked list kept in Redis for later pages
+
+    # -----------------------
+    # SEMANTIC SEARCH (vector + lexical fusion)
+    # -----------------------
+    SEMANTIC_FUSION: str = "rrf"                  # rrf | weighted
+    SEMANTIC_RRF_K: int = 60                      # rank damping of reciprocal rank fusion
+    SEMANTIC_VECTOR_WEIGHT: float = 0.5           # weighted fusion: vector share, lexical gets the rest
+    SEMANTIC_RETRIEVER_DEPTH: int = 50            # candidates fetched from each retriever
+    SEMANTIC_VECTOR_TIMEOUT_SECONDS: float = 1.0  # embedding + vector search
+    SEMANTIC_KEYWORD_TIMEOUT_SECONDS: float = 1.0 # Postgres full-text query
+
+    # -----------------------
+    # EVENT WORKER
+    # -----------------------
+    EVENT_BATCH_SIZE: int = 500              # max events per XREADGROUP / transaction
+    EVENT_CONSUMER_NAME: str = ""            # worker's name in the stream's consumer group ("" = hostname)
+    EVENT_FLUSH_INTERVAL_MS: int = 1000      # max wait for a batch to fill, from its first event
+    EVENT_REPORT_INTERVAL_SECONDS: float = 10.0
+    EVENT_WORKER_METRICS_PORT: int = 9100    # Prometheus /metrics of the worker (0 = off)
+    EVENT_STREAM_MAXLEN: int = 0             # approximate cap on stream length (0 = uncapped)
+    EVENT_BATCH_MAX_EVENTS: int = 500        # events accepted per POST /events/batch
+
+    # -----------------------
+    # INGESTION
+    # -----------------------
+    INGEST_EMBED_BATCH_SIZE: int = 64      # texts per SentenceTransformer forward pass
+    INGEST_UPSERT_BATCH_SIZE: int = 256    # points per Qdrant upsert request
+    EMBEDDING_STORE_ENABLED: bool = True   # reuse stored vectors of unchanged texts
+    STREAM_INGEST_BATCH_SIZE: int = 256    # products per pipeline batch (streaming upload)
+    STREAM_INGEST_QUEUE_SIZE: int = 4      # batches buffered between pipeline stages
+    STREAM_INGEST_MAX_LINE_BYTES: int = 1048576  # longer upload lines are dropped as invalid
 
     class Config:
         env_file = ".env"
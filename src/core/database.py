@@ -1,33 +1,131 @@
 # src/core/database.py
+"""
+Async database engines and sessions.
 
+- engine / AsyncSessionLocal / get_db: the primary, for writes
+  (ingestion, event worker, reindex)
+- read_engine / ReadSessionLocal / get_read_db: read-only traffic
+  (search routes), on READ_DATABASE_URL when a replica is set, else
+  the primary; always its own pool, so heavy ingest cannot exhaust
+  the connections search needs
+
+Both pools are sized by the DB_* settings (per process).
+"""
+
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from src.core.config import settings
-from src.models.product import Base as ProductBase
+from src.models.product import Base as ProductBase, Product
 from src.models.event import Base as EventBase
+from src.models.embedding import Base as EmbeddingBase
+from src.models.behavior import Base as BehaviorBase
 
-DATABASE_URL = (
+DATABASE_URL = settings.DATABASE_URL or (
     f"postgresql+asyncpg://{settings.POSTGRES_USER}:"
     f"{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:"
     f"{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 )
 
-# Create async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+READ_DATABASE_URL = settings.READ_DATABASE_URL or DATABASE_URL
+
+
+def _engine_options(url: str, pool_size: int, max_overflow: int, read_only: bool = False) -> dict:
+    """
+    create_async_engine keyword arguments for `url`.
+    """
+    # Statement logging is opt-in: it costs latency
+    options = {"echo": settings.SQL_ECHO}
+
+    # SQLite (local runs / benchmarks) keeps SQLAlchemy's default pool
+    if url.startswith("sqlite"):
+        return options
+
+    options.update(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+    if "+asyncpg" in url:
+        connect_args = {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+        if read_only:
+            # Accidental writes on the read path fail instead of hitting the primary
+            connect_args["server_settings"] = {"default_transaction_read_only": "on"}
+        options["connect_args"] = connect_args
 
-# Create session factory
+    return options
+
+
+# Create async engines
+engine = create_async_engine(
+    DATABASE_URL,
+    **_engine_options(DATABASE_URL, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+)
+read_engine = create_async_engine(
+    READ_DATABASE_URL,
+    **_engine_options(
+        READ_DATABASE_URL, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW, read_only=True
+    )
+)
+
+# Create session factories
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     expire_on_commit=False,
     class_=AsyncSession
 )
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+    class_=AsyncSession
+)
 
-# Dependency for FastAPI
+# Dependencies for FastAPI
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
 
+async def get_read_db():
+    """
+    Session for read-only routes (may lag the primary on a replica).
+    """
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+async def close_db():
+    """
+    Closes both connection pools (called from the FastAPI shutdown hook).
+    """
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+# Columns added to existing tables after their first release.
+# create_all never alters a table, so init_db adds the missing ones.
+COLUMN_MIGRATIONS = {
+    "products": {
+        "behavior_score": "FLOAT DEFAULT 0",
+        "behavior_updated_at": "TIMESTAMP",
+    },
+}
+
+
+async def _add_missing_columns(conn):
+    for table, columns in COLUMN_MIGRATIONS.items():
+        existing = await conn.run_sync(
+            lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns(table)}
+        )
+        for column, ddl in columns.items():
+            if column not in existing:
+                print(f"📌 Adding column {table}.{column}...")
+                await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
 # -------- INITIALIZE TABLES -------- #
 async def init_db():
     print("🔄 Connecting to database...")
@@ -38,6 +136,20 @@ async def init_db():
         print("📌 Creating event tables...")
         await conn.run_sync(EventBase.metadata.create_all)
 
+        print("📌 Creating embedding store table...")
+        await conn.run_sync(EmbeddingBase.metadata.create_all)
+
+        print("📌 Creating behavior bucket table...")
+        await conn.run_sync(BehaviorBase.metadata.create_all)
+
+        await _add_missing_columns(conn)
+
+        # create_all skips indexes of tables that already exist
+        if conn.dialect.name == "postgresql":
+            print("📌 Creating full-text search index...")
+            for index in Product.__table__.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
+
     print("✅ Database tables created!")
 
 
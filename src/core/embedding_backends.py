@@ -0,0 +1,187 @@
+# src/core/embedding_backends.py
+"""
+Pluggable embedding backends, selected by EMBEDDING_BACKEND:
+
+- torch:     SentenceTransformer on PyTorch (default)
+- onnx:      the same model exported to ONNX, run on ONNX Runtime (CPU)
+- onnx-int8: the ONNX model with dynamically quantized int8 weights
+
+Every backend returns L2-normalized, mean-pooled float32 vectors,
+so they are interchangeable for cosine search.
+
+onnxruntime / optimum are optional and only imported when an ONNX
+backend is selected:
+
+    pip install "optimum[onnxruntime]"
+
+The ONNX export (and int8 quantization) runs once and is cached
+under EMBEDDING_ONNX_DIR.
+"""
+
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from src.core.config import settings
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class EmbeddingBackend(ABC):
+    """
+    Interface: a blocking batched `encode`.
+    """
+
+    name = None
+
+    @abstractmethod
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Returns a (len(texts), dim) float32 array.
+        """
+
+
+class TorchBackend(EmbeddingBackend):
+    """
+    SentenceTransformer on PyTorch.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str, max_seq_length: int = None):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        if max_seq_length:
+            self.model.max_seq_length = max_seq_length
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype(np.float32, copy=False)
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    Transformer exported to ONNX and run on ONNX Runtime (CPU), with
+    the SentenceTransformer pooling (mean over tokens + L2 norm)
+    done in NumPy.
+
+    Args:
+        model_name: Hugging Face model id (same as the torch backend)
+        cache_dir: Where exported / quantized models are kept
+        quantized: Use dynamically quantized int8 weights
+        max_seq_length: Tokenizer truncation length
+    """
+
+    def __init__(self, model_name: str, cache_dir: str, quantized: bool = False, max_seq_length: int = 256):
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise RuntimeError(
+                f"EMBEDDING_BACKEND={'onnx-int8' if quantized else 'onnx'} needs onnxruntime + optimum: "
+                'pip install "optimum[onnxruntime]"'
+            ) from e
+
+        self.name = "onnx-int8" if quantized else "onnx"
+        self.max_seq_length = max_seq_length
+
+        export_dir = os.path.join(cache_dir, model_name.replace("/", "__"))
+        file_name = _ensure_onnx_export(model_name, export_dir, quantized)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            export_dir,
+            file_name=file_name,
+            provider="CPUExecutionProvider"
+        )
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        chunks = []
+
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            chunks.append(_mean_pool(np.asarray(hidden), inputs["attention_mask"]))
+
+        if not chunks:
+            return np.zeros((0, settings.EMBEDDING_DIM), dtype=np.float32)
+
+        return np.concatenate(chunks)
+
+
+def _mean_pool(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Mean over non-padding tokens, then L2-normalize
+    (what SentenceTransformer's Pooling + Normalize modules do).
+    """
+    mask = attention_mask[..., None].astype(np.float32)
+    summed = (hidden * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def _ensure_onnx_export(model_name: str, export_dir: str, quantized: bool) -> str:
+    """
+    Export (and optionally quantize) the model once.
+
+    Returns:
+        ONNX file name inside `export_dir`
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    if not os.path.exists(os.path.join(export_dir, "model.onnx")):
+        print(f"📦 Exporting {model_name} to ONNX → {export_dir}")
+        ORTModelForFeatureExtraction.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+    if not quantized:
+        return "model.onnx"
+
+    if not os.path.exists(os.path.join(export_dir, "model_quantized.onnx")):
+        print(f"📦 Quantizing {model_name} to int8 (dynamic)")
+        quantizer = ORTQuantizer.from_pretrained(export_dir, file_name="model.onnx")
+        quantizer.quantize(
+            save_dir=export_dir,
+            quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        )
+
+    return "model_quantized.onnx"
+
+
+def create_backend(name: str = None, model_name: str = None) -> EmbeddingBackend:
+    """
+    Build the backend named `name` (default: EMBEDDING_BACKEND)
+    for `model_name` (default: EMBEDDING_MODEL).
+    """
+    name = name or settings.EMBEDDING_BACKEND
+    model_name = model_name or settings.EMBEDDING_MODEL
+
+    if name == "torch":
+        return TorchBackend(model_name, settings.EMBEDDING_MAX_SEQ_LENGTH)
+
+    if name in ("onnx", "onnx-int8"):
+        return OnnxBackend(
+            model_name,
+            cache_dir=settings.EMBEDDING_ONNX_DIR,
+            quantized=name == "onnx-int8",
+            max_seq_length=settings.EMBEDDING_MAX_SEQ_LENGTH
+        )
+
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {name!r}, expected one of {BACKENDS}")
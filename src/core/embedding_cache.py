@@ -0,0 +1,161 @@
+# src/core/embedding_cache.py
+"""
+Two-tier cache for query embeddings.
+
+Tier 1: in-process LRU bounded by size and TTL.
+Tier 2: optional Redis store shared by every uvicorn worker.
+
+Queries are normalized (lowercased, whitespace collapsed) before
+lookup, so "Running  Shoes" and "running shoes" share one entry.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.redis_client import get_async_redis
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query used as the cache key.
+    """
+    return " ".join(query.lower().split())
+
+
+class EmbeddingCache:
+    """
+    LRU + TTL cache in front of the embedding model,
+    optionally backed by Redis.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        redis_enabled: bool = False,
+        redis_ttl_seconds: int = 86400
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.redis_enabled = redis_enabled
+        self.redis_ttl_seconds = redis_ttl_seconds
+
+        # key → (expires_at, embedding)
+        self._entries = OrderedDict()
+
+        # Counters
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.redis_errors = 0
+
+    # --------------------------------------
+    # Keys
+    # --------------------------------------
+    @staticmethod
+    def redis_key(normalized: str) -> str:
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return f"emb:{settings.EMBEDDING_MODEL}:{settings.EMBEDDING_BACKEND}:{digest}"
+
+    # --------------------------------------
+    # Tier 1 — in-process LRU
+    # --------------------------------------
+    def _get_local(self, key: str) -> Optional[list]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, embedding = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return embedding
+
+    def _put_local(self, key: str, embedding: list):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # --------------------------------------
+    # Public API
+    # --------------------------------------
+    async def get(self, normalized: str) -> Optional[list]:
+        """
+        Look up an embedding for an already-normalized query.
+        """
+        embedding = self._get_local(normalized)
+        if embedding is not None:
+            self.memory_hits += 1
+            return embedding
+
+        if self.redis_enabled:
+            try:
+                raw = await get_async_redis().get(self.redis_key(normalized))
+            except (RedisError, OSError):
+                self.redis_errors += 1
+                raw = None
+
+            if raw is not None:
+                embedding = np.frombuffer(raw, dtype=np.float32).tolist()
+                self._put_local(normalized, embedding)
+                self.redis_hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    async def set(self, normalized: str, embedding: list):
+        """
+        Store an embedding in both tiers.
+        """
+        self._put_local(normalized, embedding)
+
+        if self.redis_enabled:
+            try:
+                await get_async_redis().set(
+                    self.redis_key(normalized),
+                    np.asarray(embedding, dtype=np.float32).tobytes(),
+                    ex=self.redis_ttl_seconds
+                )
+            except (RedisError, OSError):
+                self.redis_errors += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "redis_errors": self.redis_errors,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else None
+        }
+
+
+# Process-wide cache instance
+embedding_cache = EmbeddingCache(
+    max_size=settings.EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+    redis_enabled=settings.EMBEDDING_CACHE_REDIS_ENABLED,
+    redis_ttl_seconds=settings.EMBEDDING_CACHE_REDIS_TTL_SECONDS
+)
@@ -0,0 +1,225 @@
+# src/core/embedding_executor.py
+"""
+Dynamic micro-batching executor for the embedding model.
+
+Concurrent requests submit single texts. The executor collects
+everything that arrives within a short window (or until the batch
+is full), encodes the batch in one forward pass on a thread pool,
+and resolves each caller's future with its own vector.
+
+This keeps the event loop free while the model runs and turns N
+concurrent single-text encodes into one batched encode.
+
+Bulk encodes (ingestion) run on a separate pool, so a long ingest
+encode never holds the threads query batches are waiting for.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class EmbeddingExecutor:
+    """
+    Collects single-text encode requests into batches and runs
+    them on a bounded thread pool.
+
+    Args:
+        encode_fn: Blocking callable, list[str] → list of vectors
+        window_ms: How long to wait for more texts after the first one
+        max_batch_size: Flush immediately once this many texts are queued
+        workers: Number of batches allowed to encode concurrently
+        bulk_workers: Threads for bulk encodes submitted through `run`
+    """
+
+    def __init__(self, encode_fn, window_ms: float, max_batch_size: int, workers: int = 1, bulk_workers: int = 1):
+        self._encode_fn = encode_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.workers = workers
+        self.bulk_workers = bulk_workers
+
+        self._loop = None
+        self._queue = None
+        self._slots = None
+        self._pool = None
+        self._bulk_pool = None
+        self._task = None
+        self._batch_tasks = set()
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.in_flight = 0
+        self.batch_size_histogram = {bound: 0 for bound in BATCH_SIZE_BUCKETS}
+        self.batch_size_histogram["+Inf"] = 0
+
+    # --------------------------------------
+    # Lifecycle
+    # --------------------------------------
+    async def start(self):
+        """
+        Starts the batching loop on the running event loop.
+        """
+        if self._task is not None and self._loop is asyncio.get_running_loop():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="embedding"
+        )
+        self._bulk_pool = ThreadPoolExecutor(
+            max_workers=self.bulk_workers,
+            thread_name_prefix="embedding-bulk"
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the batching loop and fails any request still queued.
+        """
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding executor stopped"))
+
+        self._pool.shutdown(wait=False)
+        self._bulk_pool.shutdown(wait=False)
+        self._task = None
+
+    # --------------------------------------
+    # Public API
+    # --------------------------------------
+    async def submit(self, text: str) -> list:
+        """
+        Queue one text and wait for its embedding.
+        """
+        await self.start()
+
+        future = self._loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def run(self, fn, *args):
+        """
+        Run an already-batched blocking call (e.g. bulk ingestion) on
+        the bulk pool, bypassing the micro-batching queue; query
+        batches keep their own threads meanwhile.
+        """
+        await self.start()
+        return await self._loop.run_in_executor(self._bulk_pool, fn, *args)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "in_flight_batches": self.in_flight,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "max_batch_size_seen": self.max_batch_seen,
+            "batch_size_histogram": {str(k): v for k, v in self.batch_size_histogram.items()},
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "workers": self.workers,
+            "bulk_workers": self.bulk_workers
+        }
+
+    # --------------------------------------
+    # Batching loop
+    # --------------------------------------
+    async def _collect(self) -> list:
+        """
+        Wait for the first request, then keep collecting until the
+        window closes or the batch is full.
+        """
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            # Only collect a new batch once a worker slot is free, so
+            # requests keep accumulating while the pool is busy.
+            await self._slots.acquire()
+
+            try:
+                batch = await self._collect()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+
+            task = asyncio.create_task(self._encode_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _encode_batch(self, batch: list):
+        self.in_flight += 1
+
+        try:
+            batch = [(text, future) for text, future in batch if not future.cancelled()]
+            if not batch:
+                return
+
+            self._record_batch(len(batch))
+            texts = [text for text, _ in batch]
+
+            try:
+                vectors = await self._loop.run_in_executor(self._pool, self._encode_fn, texts)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def _record_batch(self, size: int):
+        self.batches += 1
+        self.items += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+
+        for bound in BATCH_SIZE_BUCKETS:
+            if size <= bound:
+                self.batch_size_histogram[bound] += 1
+                break
+        else:
+            self.batch_size_histogram["+Inf"] += 1
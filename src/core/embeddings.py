@@ -1,9 +1,122 @@
 # src/core/embeddings.py
+"""
+Local embedding generation.
 
-from sentence_transformers import SentenceTransformer
+The model is loaded lazily: importing this module is cheap, and
+the first encode (or an explicit `load_embedding_model()` from the
+app lifespan / gunicorn preload) pays the load cost once per process.
+"""
 
-model = SentenceTransformer("all-MiniLM-L6-v2")   # 384 dims
+import threading
+import time
 
-def generate_local_embedding(text: str) -> list:
-    embedding = model.encode(text)
-    return embedding.tolist()
+from src.core.config import settings
+from src.core.embedding_backends import create_backend
+from src.core.embedding_cache import embedding_cache, normalize_query
+from src.core.embedding_executor import EmbeddingExecutor
+
+# EMBEDDING_MODEL on the EMBEDDING_BACKEND runtime (torch / onnx / onnx-int8),
+# created on first use
+_backend = None
+_backend_lock = threading.Lock()
+
+# Set once a warmup forward pass has completed in this process
+_warmed_up = False
+
+WARMUP_TEXTS = ["warmup", "lightweight running shoes for daily training"]
+
+
+def load_embedding_model():
+    """
+    Load the embedding backend if it is not loaded yet (blocking).
+
+    Safe to call from several threads; only the first call loads.
+    """
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                started = time.perf_counter()
+                _backend = create_backend()
+                print(f"🧠 Loaded {settings.EMBEDDING_MODEL} ({_backend.name}) "
+                      f"in {time.perf_counter() - started:.2f}s")
+
+    return _backend
+
+
+def warmup_embedding_model():
+    """
+    Load the model and run one small forward pass (blocking), so
+    the first real request does not pay kernel / allocator setup.
+    """
+    global _warmed_up
+
+    load_embedding_model().encode(WARMUP_TEXTS, batch_size=len(WARMUP_TEXTS))
+    _warmed_up = True
+
+
+def is_model_ready() -> bool:
+    """
+    True once the model is loaded (and warmed up, if EMBEDDING_WARMUP).
+    """
+    if settings.EMBEDDING_WARMUP:
+        return _warmed_up
+    return _backend is not None
+
+
+def _encode_batch(texts: list[str], batch_size: int = None) -> list:
+    """
+    Blocking batched forward pass (runs on the executor's thread pool).
+    """
+    embeddings = load_embedding_model().encode(texts, batch_size=batch_size or len(texts))
+    return embeddings.tolist()
+
+
+# Micro-batching executor shared by every request in this process
+embedding_executor = EmbeddingExecutor(
+    _encode_batch,
+    window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+    max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+    workers=settings.EMBEDDING_EXECUTOR_WORKERS,
+    bulk_workers=settings.EMBEDDING_INGEST_WORKERS
+)
+
+
+async def generate_local_embedding(text: str) -> list:
+    """
+    Embed a single text. Concurrent callers are batched together
+    into one forward pass off the event loop.
+    """
+    return await embedding_executor.submit(text)
+
+
+async def generate_local_embeddings(texts: list[str], batch_size: int = None) -> list:
+    """
+    Encode many texts through a single `encode` call.
+
+    The backend splits the input into `batch_size` chunks
+    internally, so N products cost N / batch_size forward passes
+    instead of N. Runs on the executor's bulk pool, so search
+    queries are not queued behind it.
+    """
+    return await embedding_executor.run(
+        _encode_batch,
+        texts,
+        batch_size or settings.INGEST_EMBED_BATCH_SIZE
+    )
+
+
+async def get_query_embedding(query: str) -> list:
+    """
+    Embedding for a search query, served from the two-tier cache
+    when possible. Only cache misses reach the model.
+    """
+    normalized = normalize_query(query)
+
+    embedding = await embedding_cache.get(normalized)
+    if embedding is None:
+        embedding = await generate_local_embedding(normalized)
+        await embedding_cache.set(normalized, embedding)
+
+    return embedding
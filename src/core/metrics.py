@@ -0,0 +1,156 @@
+# src/core/metrics.py
+"""
+Per-stage latency instrumentation.
+
+Code paths wrap their stages in `stage(path, name)`:
+
+    with stage("search", "qdrant"):
+        hits = await vector_search(...)
+
+Each timed stage is
+- observed in the `pipeline_stage_seconds{path, stage}` Prometheus
+  histogram (scraped from /metrics, or the worker's metrics port)
+- added to the current request's timings, which ServerTimingMiddleware
+  returns as a `Server-Timing` header (visible in browser dev tools)
+
+Multi-process servers (gunicorn) need PROMETHEUS_MULTIPROC_DIR set
+so /metrics aggregates every worker.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# 0.5 ms … 10 s
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "pipeline_stage_seconds",
+    "Latency of one stage of a search / ingest / worker pipeline",
+    ["path", "stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "End-to-end HTTP request latency (until response headers)",
+    ["method", "handler", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+EVENTS_PROCESSED = Counter(
+    "events_processed_total",
+    "User events persisted by the event worker"
+)
+
+RETRIEVER_FAILURES = Counter(
+    "retriever_failures_total",
+    "Semantic-search retrievers dropped from fusion",
+    ["retriever", "reason"]
+)
+
+# Stage name → accumulated seconds, for the request being served
+_request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+class StageTimer:
+    __slots__ = ("started", "seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+
+@contextmanager
+def stage(path: str, name: str):
+    """
+    Time a block (sync or containing awaits) as `name` of `path`.
+
+    Yields a StageTimer whose `seconds` is set when the block exits.
+    """
+    timer = StageTimer()
+    try:
+        yield timer
+    finally:
+        timer.seconds = time.perf_counter() - timer.started
+        STAGE_SECONDS.labels(path, name).observe(timer.seconds)
+
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + timer.seconds
+
+
+def _server_timing(timings: dict, total: float) -> bytes:
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries).encode("latin-1")
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI middleware: collects the stage timings of each HTTP
+    request, adds them as a `Server-Timing` header and records the
+    request latency histogram.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+
+                # Endpoint name, not the raw path → bounded label cardinality
+                route = scope.get("route")
+                REQUEST_SECONDS.labels(
+                    scope["method"],
+                    getattr(route, "name", None) or "unmatched",
+                    str(message["status"])
+                ).observe(total)
+
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(timings, total)))
+                message = {**message, "headers": headers}
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+
+
+def render_metrics():
+    """
+    Returns (body, content_type) in the Prometheus text format.
+    """
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,40 @@
+# src/core/redis_client.py
+"""
+Shared async Redis client for the API process.
+
+A single connection pool is created lazily on first use and
+reused by every request, instead of opening a new connection
+per call. The pool is closed on application shutdown.
+"""
+
+import redis.asyncio as aioredis
+from src.core.config import settings
+
+_client = None
+
+
+def get_async_redis():
+    """
+    Returns the process-wide async Redis client (binary responses).
+    """
+    global _client
+
+    if _client is None:
+        _client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            max_connections=settings.REDIS_MAX_CONNECTIONS
+        )
+
+    return _client
+
+
+async def close_async_redis():
+    """
+    Closes the shared pool (called from the FastAPI shutdown hook).
+    """
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,28 +1,33 @@
 from qdrant_client import QdrantClient
-from qdrant_client.http import models as qmodels
 from src.core.config import settings
 
+# Read-only: shows what the live alias serves. To recreate the index
+# use rebuild_index.py, which builds a new versioned collection and
+# swaps the alias, instead of dropping the live collection.
 client = QdrantClient(host=settings.QDRANT_HOST, port=settings.QDRANT_PORT)
+alias = settings.QDRANT_COLLECTION_ALIAS
 
-print("Deleting old collection if exists...")
+print("=== ALIAS ===")
+target = None
+for a in client.get_aliases().aliases:
+    if a.alias_name == alias:
+        target = a.collection_name
 
-try:
-    client.delete_collection("products_collection")
-    print("Deleted.")
-except Exception as e:
-    print("Collection not found, skipping.")
+if target is None:
+    print(f"Alias '{alias}' not found (created by the first API start or rebuild_index.py).")
+else:
+    print(f"'{alias}' -> {target}")
 
-print("\nCreating new collection with EMBEDDING_DIM =", settings.EMBEDDING_DIM)
+    info = client.get_collection(target)
+    vectors = info.config.params.vectors
+    print("Vector size:", vectors.size, "(EMBEDDING_DIM =", settings.EMBEDDING_DIM, ")")
+    print("Distance:", vectors.distance)
+    print("Points:", info.points_count)
 
-client.recreate_collection(
-    collection_name="products_collection",
-    vectors_config={
-        "embedding": qmodels.VectorParams(
-            size=settings.EMBEDDING_DIM,
-            distance=qmodels.Distance.COSINE
-        )
-    }
-)
+    if vectors.size != settings.EMBEDDING_DIM:
+        print("⚠️ Vector size does not match EMBEDDING_DIM — run rebuild_index.py.")
 
-
-print("Collection recreated successfully!")
+print("\n=== VERSIONED COLLECTIONS ===")
+for c in client.get_collections().collections:
+    if c.name.startswith(f"{alias}_v"):
+        print(c.name, "(live)" if c.name == target else "")
@@ -6,22 +6,107 @@ This file:
 1. Initializes the FastAPI app
 2. Configures CORS
 3. Registers all API route modules
-4. Initializes the Qdrant vector collection at startup
+4. Opens shared vector store (Qdrant or in-process NumPy) / Redis
+   clients and verifies the vector collection in the application
+   lifespan
+5. Loads + warms up the embedding model in the background
+   (readiness is reported by /ready)
+6. Times every request (Server-Timing header + /metrics)
+7. Subscribes to product cache invalidations
+
+With EMBEDDING_PRELOAD the model is loaded when this module is
+imported, so `gunicorn --preload` (see gunicorn.conf.py) loads it
+once in the master and every forked worker shares the weights
+copy-on-write.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.api.routes.events import router as events_router
+from src.api.routes.health import router as health_router
+from src.api.routes.metrics import router as metrics_router
 from src.api.routes.products import router as products_router
 from src.api.routes.search import router as search_router
 from src.api.routes.semantic import router as semantic_router
-from src.services.vector_service import init_qdrant_collection
+from src.services.vector_service import init_vector_store, close_vector_store
+from src.core.redis_client import close_async_redis
+from src.core.database import close_db
+from src.services.product_cache import cache_in_use, run_invalidation_listener
+from src.core.config import settings
+from src.core.metrics import ServerTimingMiddleware
+from src.core.embeddings import (
+    embedding_executor,
+    load_embedding_model,
+    warmup_embedding_model,
+)
+
+
+# Load before fork (gunicorn preload_app) → weights shared by workers
+if settings.EMBEDDING_PRELOAD:
+    load_embedding_model()
+
+
+async def _prepare_model():
+    """
+    Load (if not preloaded) and warm up the model on the embedding
+    thread pool, without blocking startup or the event loop.
+    """
+    prepare = warmup_embedding_model if settings.EMBEDDING_WARMUP else load_embedding_model
+
+    try:
+        await embedding_executor.run(prepare)
+        print("✅ Embedding model ready.")
+    except Exception as e:
+        print(f"❌ Embedding model failed to load: {e}")
+
+
+# ------------------------------------------------------------
+# Lifespan — Shared Clients + Vector Collection
+# ------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Runs once per worker process.
+
+    Startup: opens the vector store (pooled AsyncQdrantClient, or
+    the persisted NumPy index), ensures the collection exists and
+    starts the embedding executor before any request is served.
+    The model loads in the background; /ready turns 200 once it
+    is warmed up. With the product cache in use (Postgres ranking),
+    a background task applies invalidations published by ingestion
+    and the event worker.
+    Shutdown: stops the executor and closes the vector store
+    (the NumPy index is persisted), the Redis connection pool and
+    the database pools.
+    """
+    await init_vector_store()
+    await embedding_executor.start()
+
+    model_task = asyncio.create_task(_prepare_model())
+
+    invalidation_task = None
+    if cache_in_use():
+        invalidation_task = asyncio.create_task(run_invalidation_listener())
+
+    yield
+
+    model_task.cancel()
+    if invalidation_task is not None:
+        invalidation_task.cancel()
+    await embedding_executor.stop()
+    await close_vector_store()
+    await close_async_redis()
+    await close_db()
 
 
 # ------------------------------------------------------------
 # FastAPI Application Initialization
 # ------------------------------------------------------------
-app = FastAPI(title="Contextual Search Platform")
+app = FastAPI(title="Contextual Search Platform", lifespan=lifespan)
 
 
 # ------------------------------------------------------------
@@ -32,26 +117,23 @@ app.add_middleware(
     allow_origins=["*"],       # Allow all origins (safe for dev mode)
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
 
 # ------------------------------------------------------------
-# API Route Registration
+# Per-stage timings → Server-Timing header + Prometheus histograms
 # ------------------------------------------------------------
-app.include_router(products_router, prefix="/api/v1/products", tags=["Products"])
-app.include_router(search_router, prefix="/api/v1/search", tags=["Search"])
-app.include_router(semantic_router, prefix="/api/v1/search", tags=["Semantic Search"])
+app.add_middleware(ServerTimingMiddleware)
 
 
 # ------------------------------------------------------------
-# Startup Event — Ensure Qdrant Collection Exists
+# API Route Registration
 # ------------------------------------------------------------
-@app.on_event("startup")
-def startup_event():
-    """
-    Called automatically when the server starts.
+app.include_router(health_router, tags=["Health"])
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(products_router, prefix="/api/v1/products", tags=["Products"])
+app.include_router(search_router, prefix="/api/v1/search", tags=["Search"])
+app.include_router(semantic_router, prefix="/api/v1/search", tags=["Semantic Search"])
+app.include_router(events_router, prefix="/api/v1/events", tags=["Events"])
 
-    Ensures Qdrant collection is created before
-    any ingestion or search requests are made.
-    """
-    init_qdrant_collection()
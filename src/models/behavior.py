@@ -0,0 +1,29 @@
+# src/models/behavior.py
+"""
+SQLAlchemy model for rolling behavior aggregates.
+
+The event worker folds every event into an hourly bucket per
+(product, event type). Buckets older than
+BEHAVIOR_BUCKET_RETENTION_HOURS are pruned, so the table stays
+compact; it is the source for rebuilding the decayed behavior
+scores (e.g. after changing the half-life) and for recency queries
+that would be far too slow over `user_events`.
+"""
+
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class BehaviorBucket(Base):
+    __tablename__ = "product_behavior_buckets"
+
+    product_id = Column(String, primary_key=True)
+    event_type = Column(String, primary_key=True)
+
+    # UTC hour the events fall in (truncated, naive like the other timestamps)
+    bucket_start = Column(DateTime, primary_key=True, index=True)
+
+    # Event count, or seconds for dwell events
+    amount = Column(Float, nullable=False, default=0.0)
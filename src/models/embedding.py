@@ -0,0 +1,29 @@
+# src/models/embedding.py
+"""
+SQLAlchemy model for stored embeddings.
+
+Vectors are keyed by a content hash of model + backend + embedded
+text, so unchanged products never need to be encoded twice — across
+re-ingests, reindexes and processes.
+"""
+
+from sqlalchemy import Column, String, Integer, LargeBinary, DateTime
+from sqlalchemy.orm import declarative_base
+from datetime import datetime
+
+Base = declarative_base()
+
+
+class StoredEmbedding(Base):
+    __tablename__ = "embeddings"
+
+    # sha256 hex of "<model>:<backend>\n<text>"
+    content_hash = Column(String(64), primary_key=True)
+
+    model = Column(String, nullable=False)
+    dim = Column(Integer, nullable=False)
+
+    # float32 little-endian bytes (dim × 4)
+    vector = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -5,9 +5,12 @@ SQLAlchemy database model for Product.
 This table stores all product metadata along with
 behavioral interaction metrics (clicks, carts, purchases, etc.)
 which are later used for ranking during search.
+
+It also defines the full-text search document (title + description)
+and its GIN expression index used for keyword retrieval.
 """
 
-from sqlalchemy import Column, String, Float, Integer, JSON, DateTime
+from sqlalchemy import Column, String, Float, Integer, JSON, DateTime, Index, func, literal_column
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
 import uuid
@@ -15,6 +18,26 @@ import uuid
 Base = declarative_base()
 
 
+# ------------------------------------------------------------
+# Full-text search (PostgreSQL)
+# ------------------------------------------------------------
+# Text search configuration, inlined as a literal so the query
+# expression matches the index expression exactly.
+FTS_CONFIG = literal_column("'english'::regconfig")
+
+
+def fts_document(title, description):
+    """
+    tsvector over title + description.
+    """
+    return func.to_tsvector(
+        FTS_CONFIG,
+        func.coalesce(title, literal_column("''"))
+        .op("||")(literal_column("' '"))
+        .op("||")(func.coalesce(description, literal_column("''")))
+    )
+
+
 class Product(Base):
     """
     Represents a product stored in PostgreSQL.
@@ -47,6 +70,25 @@ class Product(Base):
     total_dwell_time = Column(Float, default=0.0)
     bounce_count = Column(Integer, default=0)
 
+    # Exponentially decayed weighted event score as of behavior_updated_at
+    # (maintained incrementally by the event worker, aged on read)
+    behavior_score = Column(Float, default=0.0)
+    behavior_updated_at = Column(DateTime)
+
     # Timestamps for record tracking
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # GIN expression index → `search_document @@ query` without a table scan
+    __table_args__ = (
+        Index(
+            "ix_products_fts",
+            fts_document(title, description),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# Full-text document expression used by keyword search queries
+search_document = fts_document(Product.__table__.c.title, Product.__table__.c.description)
+
@@ -6,7 +6,9 @@ These models enforce the structure and type-safety of incoming
 API data before saving to the database or indexing in Qdrant.
 """
 
-from pydantic import BaseModel
+import math
+
+from pydantic import BaseModel, Field, field_validator
 from typing import Dict, Optional
 
 
@@ -36,4 +38,41 @@ class EventIn(BaseModel):
     """
     event_type: str            # click, cart, purchase, dwell
     product_id: str
-    dwell_time: Optional[float] = None
+    dwell_time: Optional[float] = Field(None, ge=0, allow_inf_nan=False)
+
+    # Optional context (stored with the raw event)
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+    query: Optional[str] = None
+    metadata: Optional[Dict] = None     # e.g. {"seconds": 42} for dwell
+
+    @field_validator("metadata")
+    @classmethod
+    def check_dwell_seconds(cls, metadata):
+        """
+        `metadata.seconds` is added to the dwell counters by the event
+        worker, so it must be a finite, non-negative number.
+        """
+        if metadata and "seconds" in metadata:
+            seconds = metadata["seconds"]
+            if (
+                isinstance(seconds, bool)
+                or not isinstance(seconds, (int, float))
+                or not math.isfinite(seconds)
+                or seconds < 0
+            ):
+                raise ValueError("metadata.seconds must be a non-negative number")
+        return metadata
+
+
+class SearchFilters(BaseModel):
+    """
+    Optional structured filters for product search.
+
+    These are pushed down into the vector search (Qdrant payload
+    filter) instead of being applied after retrieval.
+    """
+    category: Optional[str] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    rating_min: Optional[float] = None
@@ -0,0 +1,149 @@
+# src/services/behavior_service.py
+"""
+Rolling behavior aggregates: one row per (product, event type, UTC hour).
+
+- record_buckets   add one worker batch (INSERT … ON CONFLICT amount += delta)
+- prune_buckets    drop hours older than BEHAVIOR_BUCKET_RETENTION_HOURS
+- rebuild_scores   recompute every product's decayed behavior_score from
+                   the buckets (after changing BEHAVIOR_HALF_LIFE_HOURS
+                   or the event weights)
+
+The event worker keeps behavior_score current incrementally; the
+buckets are the compact history it can be rebuilt from.
+
+Run directly: python -m src.services.behavior_service rebuild
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models.behavior import BehaviorBucket
+from src.models.product import Product
+from src.services.learning_service import EVENT_WEIGHTS, decay_factor, to_epoch
+
+BUCKET_SECONDS = 3600
+
+# Products per UPDATE executemany during a rebuild
+REBUILD_CHUNK_SIZE = 1000
+
+
+def bucket_start(timestamp: float) -> datetime:
+    """
+    Unix seconds → start of its UTC hour (naive, like stored timestamps).
+    """
+    return datetime.utcfromtimestamp(timestamp - timestamp % BUCKET_SECONDS)
+
+
+def _upsert(dialect_name: str):
+    """
+    INSERT … ON CONFLICT (product, type, hour) DO UPDATE amount += excluded.
+    """
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(BehaviorBucket)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(BehaviorBucket)
+    else:
+        raise RuntimeError(f"Behavior buckets do not support the {dialect_name} dialect")
+
+    return stmt.on_conflict_do_update(
+        index_elements=[BehaviorBucket.product_id, BehaviorBucket.event_type, BehaviorBucket.bucket_start],
+        set_={"amount": BehaviorBucket.amount + stmt.excluded.amount}
+    )
+
+
+class BehaviorService:
+
+    @staticmethod
+    async def record_buckets(db: AsyncSession, buckets: dict):
+        """
+        Add (product_id, event_type, bucket_start) → amount to the
+        aggregates. Runs in the caller's transaction (no commit).
+        """
+        if not buckets:
+            return
+
+        rows = [
+            {"product_id": product_id, "event_type": event_type, "bucket_start": start, "amount": amount}
+            for (product_id, event_type, start), amount in buckets.items()
+        ]
+        await db.execute(_upsert(db.bind.dialect.name), rows)
+
+    @staticmethod
+    async def prune_buckets(db: AsyncSession) -> int:
+        """
+        Delete buckets past the retention window. Returns rows deleted.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.BEHAVIOR_BUCKET_RETENTION_HOURS)
+        result = await db.execute(delete(BehaviorBucket).where(BehaviorBucket.bucket_start < cutoff))
+        await db.commit()
+        return result.rowcount or 0
+
+    @staticmethod
+    async def rebuild_scores(db: AsyncSession) -> int:
+        """
+        Recompute behavior_score of every product from the retained
+        buckets, each bucket counted at its midpoint. Products without
+        buckets drop to 0. Returns the number of products scored.
+        """
+        now = time.time()
+        now_dt = datetime.utcfromtimestamp(now)
+        scores = {}
+
+        stmt = select(
+            BehaviorBucket.product_id, BehaviorBucket.event_type,
+            BehaviorBucket.bucket_start, BehaviorBucket.amount
+        )
+        for row in (await db.execute(stmt)).all():
+            weight = EVENT_WEIGHTS.get(row.event_type)
+            if weight is None:
+                continue
+            age = now - (to_epoch(row.bucket_start) + BUCKET_SECONDS / 2)
+            scores[row.product_id] = (
+                scores.get(row.product_id, 0.0) + weight * row.amount * float(decay_factor(age))
+            )
+
+        await db.execute(update(Product).values(behavior_score=0.0, behavior_updated_at=now_dt))
+
+        products = Product.__table__
+        stmt = (
+            products.update()
+            .where(products.c.id == bindparam("product_id_key"))
+            .values(behavior_score=bindparam("score"))
+        )
+        items = list(scores.items())
+        for start in range(0, len(items), REBUILD_CHUNK_SIZE):
+            await db.execute(
+                stmt,
+                [{"product_id_key": pid, "score": score} for pid, score in items[start:start + REBUILD_CHUNK_SIZE]]
+            )
+
+        await db.commit()
+        return len(scores)
+
+
+# Run directly: python -m src.services.behavior_service rebuild
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    from src.core.database import AsyncSessionLocal
+
+    async def main():
+        async with AsyncSessionLocal() as db:
+            if sys.argv[1:] == ["rebuild"]:
+                scored = await BehaviorService.rebuild_scores(db)
+                print(f"✅ Rebuilt behavior scores of {scored} products "
+                      f"(half-life {settings.BEHAVIOR_HALF_LIFE_HOURS}h). "
+                      f"Run rebuild_index.py to refresh vector payloads.")
+            elif sys.argv[1:] == ["prune"]:
+                deleted = await BehaviorService.prune_buckets(db)
+                print(f"🗑 Pruned {deleted} behavior buckets.")
+            else:
+                print("Usage: python -m src.services.behavior_service rebuild|prune")
+
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+# src/services/embedding_store.py
+"""
+Persistent content-hash embedding store (Postgres).
+
+    hash = sha256("<EMBEDDING_MODEL>:<EMBEDDING_BACKEND>\\n<text>")
+
+`embed_texts` looks up every hash in one bulk query per chunk,
+encodes only the misses (deduplicated) and stores them, so
+re-ingesting or reindexing an unchanged catalog is I/O, not model
+inference. Changing the model or backend changes every hash, so
+stale vectors are never served.
+"""
+
+import hashlib
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.embeddings import generate_local_embeddings
+from src.models.embedding import StoredEmbedding
+
+# Hashes per SELECT … WHERE content_hash IN (...)
+LOOKUP_CHUNK_SIZE = 1000
+
+
+def content_hash(text: str) -> str:
+    key = f"{settings.EMBEDDING_MODEL}:{settings.EMBEDDING_BACKEND}\n{text}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _insert(dialect_name: str):
+    """
+    INSERT … ON CONFLICT DO NOTHING for the current dialect, so
+    concurrent writers of the same text do not fail.
+    """
+    if dialect_name == "postgresql":
+        return postgresql.insert(StoredEmbedding).on_conflict_do_nothing()
+    if dialect_name == "sqlite":
+        return sqlite.insert(StoredEmbedding).on_conflict_do_nothing()
+    raise RuntimeError(f"Embedding store does not support the {dialect_name} dialect")
+
+
+class EmbeddingStore:
+    """
+    Bulk get / put of stored vectors, plus hit / miss counters.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    async def get_many(db: AsyncSession, hashes: list) -> dict:
+        """
+        Returns hash → vector (list of floats) for the stored hashes.
+        """
+        found = {}
+
+        for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+            chunk = hashes[start:start + LOOKUP_CHUNK_SIZE]
+            stmt = select(StoredEmbedding.content_hash, StoredEmbedding.vector).where(
+                StoredEmbedding.content_hash.in_(chunk)
+            )
+            for row in (await db.execute(stmt)).all():
+                found[row.content_hash] = np.frombuffer(row.vector, dtype=np.float32).tolist()
+
+        return found
+
+    @staticmethod
+    async def put_many(db: AsyncSession, vectors: dict):
+        """
+        Store hash → vector, skipping hashes that already exist.
+        """
+        if not vectors:
+            return
+
+        rows = [
+            {
+                "content_hash": digest,
+                "model": settings.EMBEDDING_MODEL,
+                "dim": len(vector),
+                "vector": np.asarray(vector, dtype=np.float32).tobytes(),
+            }
+            for digest, vector in vectors.items()
+        ]
+
+        await db.execute(_insert(db.bind.dialect.name), rows)
+        await db.commit()
+
+    async def embed_texts(self, texts: list[str], db: AsyncSession) -> list:
+        """
+        Embeddings for `texts` (same order), encoding only texts that
+        are not stored yet.
+        """
+        hashes = [content_hash(text) for text in texts]
+        found = await self.get_many(db, list(set(hashes)))
+
+        # Encode each missing text once, even if repeated in the batch
+        missing = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in found:
+                missing.setdefault(digest, text)
+
+        hit_count = sum(1 for digest in hashes if digest in found)
+        self.hits += hit_count
+        self.misses += len(texts) - hit_count
+
+        if missing:
+            encoded = await generate_local_embeddings(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), encoded))
+            await self.put_many(db, new_vectors)
+            found.update(new_vectors)
+
+        return [found[digest] for digest in hashes]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
+
+
+# Process-wide store
+embedding_store = EmbeddingStore()
@@ -1,36 +1,54 @@
 # src/services/event_service.py
+"""
+Event ingestion into the Redis stream consumed by the event worker.
+
+Events go over the shared async Redis pool; a batch is sent as one
+pipelined round trip of XADDs. With EVENT_STREAM_MAXLEN set, every
+XADD trims the stream approximately (MAXLEN ~ N), which Redis does
+cheaply in whole macro-nodes.
+"""
 
 import json
-import redis
+import uuid
+
 from src.core.config import settings
+from src.core.redis_client import get_async_redis
 
 
 EVENT_STREAM = "user_events"
 
 
-def get_redis_client():
-    return redis.Redis(
-        host=settings.REDIS_HOST,
-        port=settings.REDIS_PORT,
-        decode_responses=True
-    )
-
-
 class EventService:
 
     @staticmethod
-    def push_event(event: dict):
+    async def push_events(events: list[dict]) -> list[str]:
         """
-        Push an event into Redis Stream for async processing.
+        Push events into the Redis stream for async processing,
+        in one pipelined request. Each event gets an `id` if missing.
+
+        Returns the stream ids, in order.
         """
+        if not events:
+            return []
 
-        redis_client = get_redis_client()
+        maxlen = settings.EVENT_STREAM_MAXLEN or None
 
-        redis_client.xadd(
-            EVENT_STREAM,
-            {
-                "data": json.dumps(event)
-            }
-        )
+        pipe = get_async_redis().pipeline(transaction=False)
+        for event in events:
+            event.setdefault("id", str(uuid.uuid4()))
+            pipe.xadd(
+                EVENT_STREAM,
+                {"data": json.dumps(event)},
+                maxlen=maxlen,
+                approximate=True
+            )
 
-        return {"status": "queued", "event": event}
+        stream_ids = await pipe.execute()
+        return [sid.decode() if isinstance(sid, bytes) else sid for sid in stream_ids]
+
+    @staticmethod
+    async def push_event(event: dict) -> str:
+        """
+        Push a single event. Returns its stream id.
+        """
+        return (await EventService.push_events([event]))[0]
@@ -2,18 +2,146 @@
 """
 Ingestion service responsible for:
 1. Saving incoming product data to Postgres
-2. Generating embeddings for each product
+2. Generating embeddings for each product (texts embedded before
+   are read from the content-hash embedding store instead)
 3. Storing vectors + metadata in Qdrant for semantic search
+
+Two entry points share the same stages:
+- ingest_products: one in-memory batch (JSON array body)
+- ingest_stream: NDJSON / CSV upload processed as a pipeline of
+  bounded queues (parse → Postgres → embed → Qdrant), so memory
+  stays flat regardless of upload size
 """
 
+import asyncio
+import csv
+import json
+import time
 import uuid
 from datetime import datetime
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.core.metrics import stage
+
 from src.models.product import Product
 from src.models.schemas import ProductIn
-from src.core.embeddings import generate_local_embedding
-from src.services.vector_service import vector_upsert
+from src.core.embeddings import generate_local_embeddings
+from src.services.vector_service import vector_upsert_batch
+from src.services.learning_service import RESULT_FIELDS, behavior_payload
+from src.services.result_cache import CATALOG_VERSION_KEY, bump_version
+from src.services.product_cache import publish_invalidation
+from src.services.embedding_store import embedding_store
+
+
+def _stage_stats(count: int, seconds: float) -> dict:
+    """
+    Summarize one ingestion stage as duration + items/sec.
+    """
+    return {
+        "seconds": round(seconds, 4),
+        "items_per_sec": round(count / seconds, 1) if seconds > 0 else None
+    }
+
+
+# --------------------------------------
+# Streaming input parsing
+# --------------------------------------
+class LineTooLong(ValueError):
+    """
+    An upload line longer than STREAM_INGEST_MAX_LINE_BYTES.
+    """
+
+
+async def _iter_lines(chunks, max_line_bytes: int):
+    """
+    Yield complete lines (bytes, without the line break) from an async
+    stream of byte chunks. Each byte is scanned once; a line longer
+    than `max_line_bytes` is yielded as a LineTooLong instead, and its
+    bytes are dropped as they arrive, so memory stays bounded.
+
+    Splitting raw bytes on b"\n" is safe for UTF-8 (the byte never
+    occurs inside a multi-byte character).
+    """
+    parts = []
+    size = 0
+
+    def finish():
+        if size > max_line_bytes:
+            return LineTooLong(f"Line longer than {max_line_bytes} bytes")
+        return b"".join(parts).rstrip(b"\r")
+
+    async for chunk in chunks:
+        for i, piece in enumerate(chunk.split(b"\n")):
+            if i:
+                yield finish()
+                parts, size = [], 0
+
+            size += len(piece)
+            if size <= max_line_bytes:
+                parts.append(piece)
+            else:
+                parts.clear()
+
+    if size:
+        yield finish()
+
+
+# _RecordParser.parse result for the CSV header row
+_HEADER = object()
+
+
+class _RecordParser:
+    """
+    Turns one NDJSON or CSV line into a dict.
+
+    CSV needs a header row; an `attributes` column holds a JSON
+    object. Quoted fields spanning several lines are not supported.
+    """
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.header = None
+
+    def parse(self, line: str):
+        """
+        Returns the record, or _HEADER for the CSV header row.
+        Raises ValueError on malformed input.
+        """
+        if self.fmt == "ndjson":
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"Expected a JSON object, got {type(record).__name__}")
+            return record
+
+        values = next(csv.reader([line]))
+        if self.header is None:
+            self.header = [h.strip() for h in values]
+            return _HEADER
+
+        record = dict(zip(self.header, values))
+        record["attributes"] = json.loads(record.get("attributes") or "{}")
+        return record
+
+
+def product_text(product) -> str:
+    """
+    Text embedded for a product (ProductIn or Product row).
+    """
+    return f"{product.title} {product.description}"
+
+
+def product_payload(product) -> dict:
+    """
+    Vector payload for a stored Product row: product metadata
+    plus its denormalized behavior fields.
+    """
+    return {
+        **{field: getattr(product, field) for field in RESULT_FIELDS},
+        **behavior_payload(product)
+    }
 
 
 class IngestionService:
@@ -24,6 +152,65 @@ class IngestionService:
     - Vector store upsert
     """
 
+    # --------------------------------------
+    # Stages (shared by both entry points)
+    # --------------------------------------
+    @staticmethod
+    async def _store_products(products: list[ProductIn], db: AsyncSession) -> list:
+        """
+        Bulk insert products with a single executemany INSERT,
+        saved in a single transaction. Returns the inserted rows.
+        """
+        now = datetime.utcnow()
+
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "title": p.title,
+                "description": p.description,
+                "category": p.category,
+                "price": p.price,
+                "rating": p.rating,
+                "attributes": p.attributes,
+                "created_at": now,
+                "updated_at": now
+            }
+            for p in products
+        ]
+
+        await db.execute(insert(Product), rows)
+        await db.commit()
+
+        return rows
+
+    @staticmethod
+    async def embed_products(products: list, db: AsyncSession) -> list:
+        """
+        Generate embeddings in batched forward passes. With the
+        embedding store enabled, only texts never embedded before
+        reach the model.
+        """
+        texts = [product_text(p) for p in products]
+
+        if settings.EMBEDDING_STORE_ENABLED:
+            return await embedding_store.embed_texts(texts, db)
+
+        return await generate_local_embeddings(texts)
+
+    @staticmethod
+    async def _index_products(rows: list, embeddings: list):
+        """
+        Upsert vectors + metadata into Qdrant in chunks, with the same
+        payload a reindex writes (product fields + behavior fields).
+        """
+        await vector_upsert_batch([
+            (row["id"], embedding, product_payload(Product(**row)))
+            for row, embedding in zip(rows, embeddings)
+        ])
+
+    # --------------------------------------
+    # In-memory batch
+    # --------------------------------------
     @staticmethod
     async def ingest_products(products: list[ProductIn], db: AsyncSession):
         """
@@ -31,51 +218,182 @@ class IngestionService:
         1. Postgres DB
         2. Qdrant vector store
 
+        Every stage works on the whole batch at once: one bulk
+        INSERT, batched embedding, and chunked Qdrant upserts.
+
         Args:
             products: List of ProductIn objects from API
             db: AsyncSession for DB operations
 
         Returns:
-            JSON summary of ingestion status
+            JSON summary of ingestion status with per-stage throughput
         """
 
-        stored_products = []
+        if not products:
+            return {
+                "message": "Products ingested successfully",
+                "count": 0
+            }
 
-        # STEP 1 — Store raw product records in Postgres
-        for p in products:
-            product_id = str(uuid.uuid4())
+        stages = {}
 
-            product = Product(
-                id=product_id,
-                title=p.title,
-                description=p.description,
-                category=p.category,
-                price=p.price,
-                rating=p.rating,
-                attributes=p.attributes,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
+        # STEP 1 — Bulk insert raw product records in Postgres
+        with stage("ingest", "postgres") as timer:
+            rows = await IngestionService._store_products(products, db)
+        stages["postgres"] = _stage_stats(len(rows), timer.seconds)
 
-            db.add(product)
-            stored_products.append((product_id, p))
+        # STEP 2 — Generate embeddings in batched forward passes
+        with stage("ingest", "embedding") as timer:
+            embeddings = await IngestionService.embed_products(products, db)
+        stages["embedding"] = _stage_stats(len(products), timer.seconds)
 
-        # Save all records in a single transaction
-        await db.commit()
+        # STEP 3 — Upsert vectors + metadata into Qdrant in chunks
+        with stage("ingest", "qdrant") as timer:
+            await IngestionService._index_products(rows, embeddings)
+        stages["qdrant"] = _stage_stats(len(rows), timer.seconds)
+
+        # New products must show up in cached searches
+        await bump_version(CATALOG_VERSION_KEY)
+        await publish_invalidation([row["id"] for row in rows])
+
+        return {
+            "message": "Products ingested successfully",
+            "count": len(products),
+            "stages": stages
+        }
+
+    # --------------------------------------
+    # Streaming upload
+    # --------------------------------------
+    @staticmethod
+    async def ingest_stream(chunks, fmt: str, db: AsyncSession):
+        """
+        Ingest an NDJSON or CSV upload without holding it in memory.
+
+        Four stages run concurrently, connected by bounded queues:
+
+            parse → Postgres → embed → Qdrant
+
+        When a downstream stage falls behind, its queue fills up and
+        the upstream stage waits (backpressure), so at most
+        STREAM_INGEST_QUEUE_SIZE batches are in flight per stage.
+
+        Args:
+            chunks: Async iterator of raw body bytes
+            fmt: "ndjson" or "csv"
+            db: AsyncSession used by the Postgres stage
+
+        Returns:
+            JSON summary with counts, invalid lines and per-stage throughput
+        """
+        batch_size = settings.STREAM_INGEST_BATCH_SIZE
+        queue_size = settings.STREAM_INGEST_QUEUE_SIZE
+
+        to_store = asyncio.Queue(maxsize=queue_size)
+        to_embed = asyncio.Queue(maxsize=queue_size)
+        to_index = asyncio.Queue(maxsize=queue_size)
+
+        busy = {"parse": 0.0, "postgres": 0.0, "embedding": 0.0, "qdrant": 0.0}
+        counts = {"parsed": 0, "indexed": 0, "invalid": 0}
+        invalid_lines = []
+        started = time.perf_counter()
+
+        async def parse():
+            batch = []
+            stage_started = time.perf_counter()
+            waiting = 0.0
+
+            parser = _RecordParser(fmt)
+            line_number = 0
+
+            async for line in _iter_lines(chunks, settings.STREAM_INGEST_MAX_LINE_BYTES):
+                line_number += 1
+
+                try:
+                    if isinstance(line, LineTooLong):
+                        raise line
+                    if not line.strip():
+                        continue
+
+                    record = parser.parse(line.decode("utf-8"))
+                    if record is _HEADER:
+                        continue
+                    batch.append(ProductIn(**record))
+                    counts["parsed"] += 1
+                except (ValueError, TypeError) as e:
+                    # ValidationError, JSONDecodeError, UnicodeDecodeError
+                    # and LineTooLong are ValueErrors
+                    counts["invalid"] += 1
+                    if len(invalid_lines) < 20:
+                        invalid_lines.append({"line": line_number, "error": str(e)[:200]})
+
+                if len(batch) >= batch_size:
+                    put_started = time.perf_counter()
+                    await to_store.put(batch)
+                    waiting += time.perf_counter() - put_started
+                    batch = []
+
+            if batch:
+                await to_store.put(batch)
+            await to_store.put(None)
+
+            busy["parse"] = time.perf_counter() - stage_started - waiting
+
+        async def store():
+            while (products := await to_store.get()) is not None:
+                with stage("ingest_stream", "postgres") as timer:
+                    rows = await IngestionService._store_products(products, db)
+                busy["postgres"] += timer.seconds
+                await to_embed.put((rows, products))
+            await to_embed.put(None)
+
+        async def embed():
+            # Own session: the Postgres stage uses `db` concurrently
+            async with AsyncSessionLocal() as store_db:
+                while (item := await to_embed.get()) is not None:
+                    rows, products = item
+                    with stage("ingest_stream", "embedding") as timer:
+                        embeddings = await IngestionService.embed_products(products, store_db)
+                    busy["embedding"] += timer.seconds
+                    await to_index.put((rows, embeddings))
+            await to_index.put(None)
+
+        async def index():
+            while (item := await to_index.get()) is not None:
+                rows, embeddings = item
+                with stage("ingest_stream", "qdrant") as timer:
+                    await IngestionService._index_products(rows, embeddings)
+                busy["qdrant"] += timer.seconds
+
+                await publish_invalidation([row["id"] for row in rows])
+
+                counts["indexed"] += len(rows)
+                print(f"   … {counts['indexed']} products indexed "
+                      f"({counts['indexed'] / (time.perf_counter() - started):.0f}/sec)")
 
-        # STEP 2 — Generate embeddings + upsert vectors into Qdrant
-        for product_id, p in stored_products:
-            text = f"{p.title} {p.description}"
-            embedding = generate_local_embedding(text)
+        tasks = [asyncio.create_task(stage()) for stage in (parse, store, embed, index)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            if counts["indexed"]:
+                # New products must show up in cached searches
+                await bump_version(CATALOG_VERSION_KEY)
 
-            # Store embedding + metadata in Qdrant
-            vector_upsert(
-                product_id=product_id,
-                vector=embedding,
-                payload=p.dict()
-            )
+        elapsed = time.perf_counter() - started
+        processed = {"parse": counts["parsed"], "postgres": counts["indexed"],
+                     "embedding": counts["indexed"], "qdrant": counts["indexed"]}
 
         return {
             "message": "Products ingested successfully",
-            "count": len(products)
+            "count": counts["indexed"],
+            "invalid": counts["invalid"],
+            "invalid_lines": invalid_lines,
+            "seconds": round(elapsed, 4),
+            "items_per_sec": round(counts["indexed"] / elapsed, 1) if elapsed > 0 else None,
+            # Throughput of each stage over the time it was actually busy
+            "stages": {name: _stage_stats(processed[name], busy[name]) for name in busy}
         }
@@ -1,62 +1,235 @@
 # src/services/learning_service.py
+"""
+Behavioral ranking.
 
-def compute_behavior_score(product):
+Candidates are scored in one vectorized NumPy expression:
+
+    final = 0.7 × similarity + 0.3 × normalized_behavior
+
+where behavior is log-scaled and min-max normalized to [0, 1]
+over the candidate set, so both terms live on the same scale.
+Top-k is selected with `argpartition` and result dicts are only
+built for the survivors.
+
+Behavior is an exponentially decayed weighted event score
+(half-life BEHAVIOR_HALF_LIFE_HOURS), kept up to date incrementally
+by the event worker as `behavior_score` as of `behavior_updated_at`.
+Reading it only ages that one value to now, so recent activity
+outranks old popularity without touching `user_events`.
+"""
+
+import math
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.core.config import settings
+
+# Product fields returned with every ranked result
+RESULT_FIELDS = ("title", "description", "category", "price", "rating", "attributes")
+
+# Raw behavior counters (Postgres columns, mirrored into the vector payload)
+BEHAVIOR_FIELDS = ("click_count", "cart_count", "purchase_count", "total_dwell_time", "bounce_count")
+
+# Business weights of each counter, in BEHAVIOR_FIELDS order
+BEHAVIOR_WEIGHTS = np.array([0.5, 1.2, 3.0, 0.02, -0.5])
+
+# event_type → behavior counter it increments
+EVENT_COUNTERS = {
+    "click": "click_count",
+    "add_to_cart": "cart_count",
+    "purchase": "purchase_count",
+    "dwell": "total_dwell_time",
+    "bounce": "bounce_count",
+}
+
+# event_type → weight of one unit (event, or dwell second) in the score
+EVENT_WEIGHTS = {
+    event_type: float(BEHAVIOR_WEIGHTS[BEHAVIOR_FIELDS.index(column)])
+    for event_type, column in EVENT_COUNTERS.items()
+}
+
+SIMILARITY_WEIGHT = 0.7
+BEHAVIOR_WEIGHT = 0.3
+
+
+# --------------------------------------
+# Decay
+# --------------------------------------
+def decay_factor(age_seconds):
+    """
+    exp(−λ·age) with λ = ln 2 / half-life; scalar or array.
+    Negative ages (clock skew) do not amplify.
+    """
+    rate = math.log(2) / (settings.BEHAVIOR_HALF_LIFE_HOURS * 3600)
+    return np.exp(-rate * np.maximum(age_seconds, 0.0))
+
+
+def to_epoch(value: datetime) -> float:
+    """
+    Naive UTC datetime (as stored) → Unix seconds.
+    """
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def compute_behavior_score(product, now: float = None):
+    """
+    Decayed behavior score of a product (or row) as of `now`:
+    the precomputed `behavior_score`, aged since `behavior_updated_at`.
+    O(1) — no event history is read.
+    """
+    score = getattr(product, "behavior_score", None) or 0.0
+    updated_at = getattr(product, "behavior_updated_at", None)
+    if not score or updated_at is None:
+        return float(score)
+
+    now = time.time() if now is None else now
+    return float(score * decay_factor(now - to_epoch(updated_at)))
+
+
+def behavior_payload(product) -> dict:
+    """
+    Denormalized behavior fields stored in the vector payload,
+    so search can rank without reading Postgres.
+
+    The score is stored undecayed with its timestamp; ranking ages
+    it at query time, so the payload does not go stale while a
+    product receives no events.
+    """
+    payload = {field: getattr(product, field) or 0 for field in BEHAVIOR_FIELDS}
+    updated_at = getattr(product, "behavior_updated_at", None)
+
+    payload["behavior_score"] = float(getattr(product, "behavior_score", None) or 0.0)
+    payload["behavior_updated_at"] = to_epoch(updated_at) if updated_at is not None else None
+    return payload
+
+
+def normalize_behavior(raw: np.ndarray) -> np.ndarray:
     """
-    Convert product behavioral signals into a normalized score.
-    Weighted scoring based on business logic.
+    Map raw behavior scores to [0, 1]: log1p of the positive part,
+    then min-max over the candidate set.
     """
+    scaled = np.log1p(np.maximum(raw, 0.0))
 
-    return (
-        product.click_count * 0.5 +
-        product.cart_count * 1.2 +
-        product.purchase_count * 3.0 +
-        product.total_dwell_time * 0.02 -
-        product.bounce_count * 0.5
+    low = scaled.min()
+    spread = scaled.max() - low
+    if spread <= 0:
+        # All candidates equal → behavior does not reorder them
+        return np.zeros_like(scaled)
+
+    return (scaled - low) / spread
+
+
+def rank_top_k(similarity: np.ndarray, behavior_raw: np.ndarray, k: int = None):
+    """
+    Vectorized scoring + top-k selection.
+
+    Returns:
+        (indices of the top-k in rank order, normalized behavior, final scores)
+    """
+    behavior = normalize_behavior(behavior_raw)
+    final = SIMILARITY_WEIGHT * similarity + BEHAVIOR_WEIGHT * behavior
+
+    n = len(final)
+    k = n if k is None else min(k, n)
+
+    if k < n:
+        top = np.argpartition(-final, k - 1)[:k]
+    else:
+        top = np.arange(n)
+
+    # Only the survivors are fully sorted
+    top = top[np.argsort(-final[top], kind="stable")]
+
+    return top, behavior, final
+
+
+def _ranked_result(product_id, fields: dict, sim: float, behavior: float, raw: float, final: float) -> dict:
+    return {
+        "id": product_id,
+        **fields,
+
+        # ranking signals
+        "similarity_score": sim,
+        "behavior_score": behavior,
+        "behavior_raw": raw,
+        "final_score": final,
+
+        # human-readable explanation
+        "explanation": f"Similarity: {round(sim,3)}, BehaviorScore: {round(behavior,3)}"
+    }
+
+
+def apply_behavioral_ranking(products, similarity_map, limit: int = None):
+    """
+    Combine vector similarity + behavior score for ORM products.
+    Return the top `limit` products with explanation.
+    """
+    n = len(products)
+    if n == 0:
+        return []
+
+    now = time.time()
+    similarity = np.fromiter(
+        (similarity_map.get(str(p.id), 0.0) for p in products), dtype=np.float64, count=n
+    )
+    behavior_raw = np.fromiter(
+        (compute_behavior_score(p, now) for p in products), dtype=np.float64, count=n
     )
 
+    top, behavior, final = rank_top_k(similarity, behavior_raw, limit)
+
+    ranked_results = []
+    for i in top:
+        p = products[i]
+        fields = {field: getattr(p, field) for field in RESULT_FIELDS + BEHAVIOR_FIELDS}
+
+        ranked_results.append(_ranked_result(
+            p.id, fields,
+            float(similarity[i]), float(behavior[i]), float(behavior_raw[i]), float(final[i])
+        ))
+
+    return ranked_results
+
 
-def apply_behavioral_ranking(products, similarity_map):
+def apply_payload_ranking(hits, limit: int = None):
     """
-    Combine vector similarity + behavior score
-    Return sorted products with explanation
+    Same ranking as `apply_behavioral_ranking`, but read straight
+    from vector hits whose payload carries the precomputed
+    behavior score and its timestamp (maintained by the event
+    worker), aged to now.
+
+    Products with no behavior pushed yet score 0 on behavior.
     """
+    n = len(hits)
+    if n == 0:
+        return []
+
+    similarity = np.fromiter((hit.score for hit in hits), dtype=np.float64, count=n)
+    stored = np.fromiter(
+        ((hit.payload or {}).get("behavior_score") or 0.0 for hit in hits), dtype=np.float64, count=n
+    )
+    # NaN → no timestamp pushed yet → no decay
+    updated_at = np.fromiter(
+        ((hit.payload or {}).get("behavior_updated_at") or np.nan for hit in hits), dtype=np.float64, count=n
+    )
+    ages = np.nan_to_num(time.time() - updated_at, nan=0.0)
+    behavior_raw = stored * decay_factor(ages)
+
+    top, behavior, final = rank_top_k(similarity, behavior_raw, limit)
 
     ranked_results = []
+    for i in top:
+        hit = hits[i]
+        payload = hit.payload or {}
+
+        fields = {field: payload.get(field) for field in RESULT_FIELDS}
+        fields.update({field: payload.get(field, 0) for field in BEHAVIOR_FIELDS})
 
-    for p in products:
-        sim = similarity_map.get(str(p.id), 0)
-
-        behavior = compute_behavior_score(p)
-
-        # Final ranking (simple weighted sum)
-        final = sim * 0.7 + behavior * 0.3
-
-        ranked_results.append({
-            "id": p.id,
-            "title": p.title,
-            "description": p.description,
-            "category": p.category,
-            "price": p.price,
-            "rating": p.rating,
-            "attributes": p.attributes,
-
-            # raw behavior signals
-            "click_count": p.click_count,
-            "cart_count": p.cart_count,
-            "purchase_count": p.purchase_count,
-            "total_dwell_time": p.total_dwell_time,
-            "bounce_count": p.bounce_count,
-
-            # ranking signals
-            "similarity_score": sim,
-            "behavior_score": behavior,
-            "final_score": final,
-
-            # human-readable explanation
-            "explanation": f"Similarity: {round(sim,3)}, BehaviorScore: {round(behavior,3)}"
-        })
-
-    # Sort by final score descending
-    ranked_results.sort(key=lambda x: x["final_score"], reverse=True)
+        ranked_results.append(_ranked_result(
+            str(hit.id), fields,
+            float(similarity[i]), float(behavior[i]), float(behavior_raw[i]), float(final[i])
+        ))
 
     return ranked_results
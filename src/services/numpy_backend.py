@@ -0,0 +1,648 @@
+# src/services/numpy_backend.py
+"""
+In-process NumPy vector backend (VECTOR_BACKEND=numpy). Used through
+src.services.vector_service.
+
+For tests, dev laptops and small tenants: no Qdrant to run, and
+search cost is plain, predictable linear algebra.
+
+- Vectors live in one contiguous float32 matrix (L2-normalized rows),
+  so a search is a single matrix-vector product + `argpartition` top-k
+- Batch queries are one matrix-matrix product
+- Payload filters (category / price / rating) are vectorized masks
+  over per-field columns
+- The live index is persisted to VECTOR_NUMPY_PATH on shutdown and
+  loaded at startup, memory-mapped (copy-on-write) when
+  VECTOR_NUMPY_MMAP is set
+
+On disk, every save is a new version directory (vectors + metadata)
+and a CURRENT file naming the live one, replaced atomically — a
+reader sees either the old or the new index, never a mix. Between
+saves, every write to the live index is first appended (fsynced) to
+the version's write-ahead log and replayed at startup, so a crash
+loses nothing already acknowledged; the next save folds the log into
+a new version.
+
+Search is always exact (recall 1.0); search modes are accepted and
+ignored. The index belongs to one process: payload updates made by
+the event worker process do not reach an API process's index, so
+startup requires SEARCH_RANK_FROM_PAYLOAD=false (behavior is read
+from Postgres), and the API must run a single worker (enforced in
+gunicorn.conf.py).
+A process only persists an index it changed, and never over a
+version saved by another process (e.g. rebuild_index.py) since it
+loaded.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.core.config import settings
+from src.models.schemas import SearchFilters
+
+# Same alias name as the Qdrant backend, so collection names match
+COLLECTION_NAME = settings.QDRANT_COLLECTION_ALIAS
+
+SEARCH_MODES = ("exact", "fast", "balanced")
+
+VECTORS_FILE = "vectors.npy"
+META_FILE = "meta.json"
+
+# Names the live version directory
+CURRENT_FILE = "CURRENT"
+
+# Writes applied since the version was saved (JSON lines, in the version directory)
+LOG_FILE = "wal.log"
+
+# Version directories kept on disk (live one included), for processes
+# that still memory-map an older one
+KEEP_VERSIONS = 2
+
+
+@dataclass
+class VectorHit:
+    """
+    Search result with the same fields as Qdrant's ScoredPoint.
+    """
+    id: str
+    score: float
+    payload: dict
+
+
+def _unit_rows(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def current_version(path: str):
+    """
+    Live version directory name under `path`, or None if none was saved.
+    """
+    try:
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _set_current(path: str, version: str):
+    fd, tmp = tempfile.mkstemp(dir=path, prefix=f".{CURRENT_FILE}-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(path, CURRENT_FILE))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _prune_versions(path: str):
+    """
+    Delete all but the KEEP_VERSIONS newest version directories.
+    """
+    live = current_version(path)
+    versions = sorted(
+        (entry for entry in os.scandir(path) if entry.is_dir() and entry.name.startswith("v")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    kept = 1
+    for entry in versions:
+        if entry.name == live:
+            continue
+        if kept < KEEP_VERSIONS:
+            kept += 1
+            continue
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class NumpyVectorIndex:
+    """
+    Exact cosine top-k over a growable float32 matrix.
+
+    Args:
+        dim: Vector dimension
+        capacity: Initial number of preallocated rows
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self.size = 0
+
+        self.ids = []
+        self.payloads = []
+        self._positions = {}            # id → row
+
+        # Changed since created / loaded / saved
+        self.dirty = False
+
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+
+        # Filter columns (row-aligned with the matrix)
+        self._category_codes = {}       # category → int code
+        self._category = np.full(capacity, -1, dtype=np.int32)
+        self._price = np.full(capacity, np.nan)
+        self._rating = np.full(capacity, np.nan)
+
+    # --------------------------------------
+    # Storage
+    # --------------------------------------
+    def _grow(self, needed: int):
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, capacity * 2, 1024)
+
+        def grown(column, fill, dtype):
+            out = np.full((new_capacity,) + column.shape[1:], fill, dtype=dtype)
+            out[:self.size] = column[:self.size]
+            return out
+
+        # Also moves a memory-mapped matrix into RAM
+        self._vectors = grown(self._vectors, 0.0, np.float32)
+        self._category = grown(self._category, -1, np.int32)
+        self._price = grown(self._price, np.nan, np.float64)
+        self._rating = grown(self._rating, np.nan, np.float64)
+
+    def _set_filter_columns(self, row: int, payload: dict):
+        category = payload.get("category")
+        if category is None:
+            self._category[row] = -1
+        else:
+            self._category[row] = self._category_codes.setdefault(category, len(self._category_codes))
+
+        self._price[row] = _as_float(payload.get("price"))
+        self._rating[row] = _as_float(payload.get("rating"))
+
+    def upsert(self, ids: list, vectors, payloads: list):
+        """
+        Insert new points / overwrite existing ones, by id.
+        """
+        if not ids:
+            return
+
+        self.dirty = True
+        matrix = _unit_rows(vectors)
+        new_count = sum(1 for product_id in set(ids) if product_id not in self._positions)
+        self._grow(self.size + new_count)
+
+        for product_id, vector, payload in zip(ids, matrix, payloads):
+            row = self._positions.get(product_id)
+            if row is None:
+                row = self.size
+                self.size += 1
+                self._positions[product_id] = row
+                self.ids.append(product_id)
+                self.payloads.append(payload)
+            else:
+                self.payloads[row] = payload
+
+            self._vectors[row] = vector
+            self._set_filter_columns(row, payload)
+
+    def set_payloads(self, payloads: dict):
+        """
+        Merge partial payloads into existing points (unknown ids are skipped).
+        """
+        for product_id, payload in payloads.items():
+            row = self._positions.get(product_id)
+            if row is None:
+                continue
+            self.dirty = True
+            self.payloads[row] = {**self.payloads[row], **payload}
+            self._set_filter_columns(row, self.payloads[row])
+
+    # --------------------------------------
+    # Search
+    # --------------------------------------
+    def _mask(self, n: int, filters: SearchFilters = None):
+        """
+        Boolean mask over the first `n` rows for the filters, or None
+        when unfiltered. Points without the filtered field never match
+        (as in Qdrant).
+        """
+        if filters is None:
+            return None
+
+        mask = np.ones(n, dtype=bool)
+        filtered = False
+
+        if filters.category is not None:
+            code = self._category_codes.get(filters.category, -2)
+            mask &= self._category[:n] == code
+            filtered = True
+
+        with np.errstate(invalid="ignore"):
+            if filters.price_min is not None:
+                mask &= self._price[:n] >= filters.price_min
+                filtered = True
+            if filters.price_max is not None:
+                mask &= self._price[:n] <= filters.price_max
+                filtered = True
+            if filters.rating_min is not None:
+                mask &= self._rating[:n] >= filters.rating_min
+                filtered = True
+
+        return mask if filtered else None
+
+    def _hits(self, scores: np.ndarray, rows: np.ndarray) -> list:
+        return [
+            VectorHit(id=self.ids[row], score=float(scores[row]), payload=self.payloads[row])
+            for row in rows
+            if scores[row] > -np.inf
+        ]
+
+    def search_batch(self, queries, limit: int = 5, filters: SearchFilters = None) -> list:
+        """
+        Top-`limit` points for each query row.
+
+        Runs in a worker thread while upserts run on the event loop:
+        the size is read once, so rows appended meanwhile are ignored
+        and every column is sliced to the same length.
+
+        Returns:
+            One list of VectorHit per query, best first
+        """
+        queries = _unit_rows(queries)
+        n = self.size
+        if n == 0 or limit <= 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ self._vectors[:n].T          # (queries, n)
+
+        mask = self._mask(n, filters)
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+            n = int(mask.sum())
+            if n == 0:
+                return [[] for _ in range(len(queries))]
+
+        k = min(limit, n)
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+        # Only the survivors are fully sorted
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+
+        return [self._hits(scores[i], top[i]) for i in range(len(queries))]
+
+    def search(self, query, limit: int = 5, filters: SearchFilters = None) -> list:
+        return self.search_batch([query], limit, filters)[0]
+
+    # --------------------------------------
+    # Persistence
+    # --------------------------------------
+    def save(self, path: str) -> str:
+        """
+        Write the index to `path` (a directory) as a new version
+        directory with a unique name, then point CURRENT at it.
+        Concurrent writers never share a file, and a reader never
+        sees a partial index. Returns the version name.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        version_dir = tempfile.mkdtemp(dir=path, prefix=f"v{int(time.time() * 1000)}-")
+        try:
+            with open(os.path.join(version_dir, VECTORS_FILE), "wb") as f:
+                np.save(f, self._vectors[:self.size])
+                f.flush()
+                os.fsync(f.fileno())
+
+            with open(os.path.join(version_dir, META_FILE), "w") as f:
+                json.dump({"dim": self.dim, "size": self.size, "ids": self.ids, "payloads": self.payloads}, f)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+
+        version = os.path.basename(version_dir)
+        _set_current(path, version)
+        _prune_versions(path)
+
+        self.dirty = False
+        return version
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, version: str = None):
+        """
+        Load the version of `path` named by CURRENT (or `version`).
+        With `mmap`, the matrix is memory-mapped copy-on-write: pages
+        are read on demand and shared between processes until written.
+        """
+        version = version or current_version(path)
+        if version is None:
+            raise FileNotFoundError(f"No vector index saved at {path}")
+        version_dir = os.path.join(path, version)
+
+        with open(os.path.join(version_dir, META_FILE)) as f:
+            meta = json.load(f)
+
+        vectors = np.load(os.path.join(version_dir, VECTORS_FILE), mmap_mode="c" if mmap else None)
+        if len(vectors) != meta["size"]:
+            raise RuntimeError(f"Vector index at {version_dir} is inconsistent (vectors / metadata size differ)")
+
+        index = cls(meta["dim"], capacity=1)
+        index.size = meta["size"]
+        index.ids = meta["ids"]
+        index.payloads = meta["payloads"]
+        index._positions = {product_id: row for row, product_id in enumerate(index.ids)}
+
+        index._vectors = vectors
+        index._category = np.full(index.size, -1, dtype=np.int32)
+        index._price = np.full(index.size, np.nan)
+        index._rating = np.full(index.size, np.nan)
+        for row, payload in enumerate(index.payloads):
+            index._set_filter_columns(row, payload)
+
+        return index
+
+
+# --------------------------------------
+# Collections + alias (same contract as the Qdrant backend)
+# --------------------------------------
+_collections = {}       # collection name → NumpyVectorIndex
+_alias_target = None    # live collection
+
+# Version on disk this process's live index was loaded from / saved as
+# (None = nothing on disk); _UNSET until init_vector_store / persist
+_UNSET = object()
+_base_version = _UNSET
+
+
+def _collection(collection_name: str = None) -> NumpyVectorIndex:
+    global _alias_target
+
+    if collection_name is None or collection_name == COLLECTION_NAME:
+        if _alias_target is None:
+            # Used before init (scripts / tests) → empty live collection
+            _alias_target = new_collection_name()
+            _collections[_alias_target] = NumpyVectorIndex(settings.EMBEDDING_DIM)
+        collection_name = _alias_target
+
+    return _collections[collection_name]
+
+
+def new_collection_name() -> str:
+    return f"{COLLECTION_NAME}_v{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
+
+
+async def create_versioned_collection(collection_name: str):
+    _collections[collection_name] = NumpyVectorIndex(settings.EMBEDDING_DIM)
+
+
+async def get_alias_target():
+    return _alias_target
+
+
+async def swap_alias(collection_name: str):
+    global _alias_target
+
+    previous = _alias_target
+    _alias_target = collection_name
+    if collection_name in _collections:
+        _collections[collection_name].dirty = True
+    return previous
+
+
+async def delete_collection(collection_name: str):
+    _collections.pop(collection_name, None)
+
+
+# --------------------------------------
+# Write-ahead log of the live collection
+# --------------------------------------
+_log_lock = asyncio.Lock()
+
+
+def _log_path():
+    """
+    Log of the live collection, or None when this process does not
+    own a persisted index (no VECTOR_NUMPY_PATH, or never initialized,
+    e.g. rebuild_index.py, which saves at the end instead).
+    """
+    if _base_version is _UNSET or _base_version is None or not settings.VECTOR_NUMPY_PATH:
+        return None
+    return os.path.join(settings.VECTOR_NUMPY_PATH, _base_version, LOG_FILE)
+
+
+def _append_log(path: str, record: dict):
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _replay_log(index: NumpyVectorIndex, path: str) -> int:
+    """
+    Re-apply logged writes to a freshly loaded index. A torn last line
+    (crash mid-append) ends the replay. Returns the records applied.
+    """
+    applied = 0
+    try:
+        f = open(path)
+    except FileNotFoundError:
+        return 0
+
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"⚠️ Ignoring a truncated record at the end of {path}.")
+                break
+
+            if record["op"] == "upsert":
+                vectors = np.frombuffer(base64.b64decode(record["vectors"]), dtype=np.float32)
+                index.upsert(record["ids"], vectors.reshape(len(record["ids"]), index.dim), record["payloads"])
+            else:
+                index.set_payloads(record["payloads"])
+            applied += 1
+
+    return applied
+
+
+async def _write(collection_name: str, record: dict, apply):
+    """
+    Run `apply` (an in-memory write to `collection_name`). Writes to
+    the live collection are logged first; the lock keeps the log in
+    the order the writes are applied.
+    """
+    live = collection_name is None or collection_name in (COLLECTION_NAME, _alias_target)
+    path = _log_path() if live else None
+    if path is None:
+        apply()
+        return
+
+    async with _log_lock:
+        try:
+            await asyncio.to_thread(_append_log, path, record)
+        except OSError as e:
+            print(f"⚠️ Could not append to vector index log {path}: {e}")
+        apply()
+
+
+def persist(path: str = None):
+    """
+    Save the live collection to VECTOR_NUMPY_PATH (or `path`) if this
+    process changed it. Skipped when another process saved a newer
+    version since this one loaded — that version wins.
+    """
+    global _base_version
+
+    path = path or settings.VECTOR_NUMPY_PATH
+    if _alias_target is None or not path:
+        return
+
+    index = _collections[_alias_target]
+    if not index.dirty:
+        return
+
+    if _base_version is not _UNSET and current_version(path) != _base_version:
+        print(f"⚠️ Vector index at {path} was saved by another process; "
+              "not overwriting it with this process's changes.")
+        return
+
+    _base_version = index.save(path)
+
+
+async def init_vector_store():
+    """
+    Load the persisted index, or start with an empty one.
+    """
+    global _alias_target, _base_version
+
+    if settings.SEARCH_RANK_FROM_PAYLOAD:
+        # The event worker's payload pushes cannot reach this process's
+        # index, so payload behavior fields would stay frozen
+        raise RuntimeError(
+            "VECTOR_BACKEND=numpy needs SEARCH_RANK_FROM_PAYLOAD=false "
+            "(behavior payload updates do not reach an in-process index)."
+        )
+
+    path = settings.VECTOR_NUMPY_PATH
+    version = current_version(path) if path else None
+    _base_version = version
+
+    if version is not None:
+        index = NumpyVectorIndex.load(path, mmap=settings.VECTOR_NUMPY_MMAP, version=version)
+        if index.dim != settings.EMBEDDING_DIM:
+            raise RuntimeError(
+                f"Vector index at {path} has dim {index.dim}, "
+                f"expected EMBEDDING_DIM={settings.EMBEDDING_DIM}. "
+                "Run `python rebuild_index.py` to rebuild it."
+            )
+
+        # Writes since that save, folded into a new version right away
+        # so new writes never land behind a torn record
+        log_path = os.path.join(path, version, LOG_FILE)
+        replayed = 0
+        if os.path.exists(log_path):
+            replayed = _replay_log(index, log_path)
+            _base_version = version = index.save(path)
+
+        _alias_target = new_collection_name()
+        _collections[_alias_target] = index
+        print(f"✅ Loaded NumPy vector index ({index.size} vectors, {replayed} logged writes) "
+              f"from {path}/{version}.")
+        return
+
+    index = _collection()
+    if path:
+        # An (empty) version to log writes against
+        _base_version = index.save(path)
+    print("✅ Started an empty NumPy vector index.")
+
+
+async def close_vector_store():
+    persist()
+
+
+async def vector_store_ready() -> bool:
+    return _alias_target is not None
+
+
+# --------------------------------------
+# Points
+# --------------------------------------
+async def vector_upsert(product_id: str, vector: list, payload: dict):
+    await vector_upsert_batch([(product_id, vector, payload)])
+
+
+async def vector_upsert_batch(points: list, batch_size: int = None, collection_name: str = None):
+    """
+    Args:
+        points: List of (product_id, vector, payload) tuples
+        batch_size: Accepted for API compatibility (single in-memory write)
+        collection_name: Target collection (default: the live alias)
+    """
+    if not points:
+        return
+
+    ids, vectors, payloads = zip(*points)
+    ids = list(ids)
+    matrix = np.asarray(vectors, dtype=np.float32)
+    payloads = [{**payload, "product_id": product_id} for product_id, payload in zip(ids, payloads)]
+
+    await _write(
+        collection_name,
+        {"op": "upsert", "ids": ids, "vectors": base64.b64encode(matrix.tobytes()).decode(), "payloads": payloads},
+        lambda: _collection(collection_name).upsert(ids, matrix, payloads)
+    )
+
+
+async def vector_set_payloads(payloads: dict, batch_size: int = None):
+    await _write(None, {"op": "payloads", "payloads": payloads}, lambda: _collection().set_payloads(payloads))
+
+
+async def vector_search(
+    query_vector: list,
+    limit: int = 5,
+    filters: SearchFilters = None,
+    mode: str = None,
+    collection_name: str = None
+):
+    """
+    Exact cosine top-k; `mode` is ignored (always exact). The scan
+    runs in a worker thread so it does not stall the event loop
+    (NumPy releases the GIL during the matrix product).
+    """
+    return await asyncio.to_thread(_collection(collection_name).search, query_vector, limit, filters)
+
+
+async def vector_search_batch(
+    query_vectors: list,
+    limit: int = 5,
+    filters: SearchFilters = None,
+    mode: str = None,
+    collection_name: str = None
+):
+    return await asyncio.to_thread(_collection(collection_name).search_batch, query_vectors, limit, filters)
@@ -0,0 +1,287 @@
+# src/services/product_cache.py
+"""
+In-process product metadata cache for search hydration.
+
+The catalog changes far less often than it is read, so hydrating
+the vector hits of a search (SEARCH_RANK_FROM_PAYLOAD=false) is
+served from a bounded id-keyed LRU; only ids not cached are fetched,
+in one bulk SELECT.
+
+Entries are NamedTuples (no per-row __dict__, no ORM identity map)
+carrying the columns ranking reads.
+
+Only used when search ranks from Postgres rows (PRODUCT_CACHE_ENABLED
+and SEARCH_RANK_FROM_PAYLOAD=false, see `cache_in_use`); otherwise
+nothing is listened for or published.
+
+Invalidation: writers publish changed product ids on a Redis pub/sub
+channel (ingestion for new / updated rows, the event worker for
+behavior changes); every API process subscribes in its lifespan and
+drops those ids. Entries also expire after PRODUCT_CACHE_TTL_SECONDS,
+which bounds staleness if a message is missed, and the cache is
+cleared whenever the subscription has to reconnect.
+
+Two races are closed:
+- an invalidation that arrives while a SELECT for that id is in
+  flight: the fetched (pre-write) row is returned but not cached
+- read-replica lag (READ_DATABASE_URL set): for
+  PRODUCT_CACHE_REPLICA_LAG_SECONDS after an invalidation, refetched
+  rows of that id are not cached either, since the replica may not
+  have applied the write yet
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.redis_client import get_async_redis
+from src.models.product import Product
+
+INVALIDATION_CHANNEL = "products:invalidate"
+
+# Message payload that drops every entry
+INVALIDATE_ALL = "*"
+
+# Ids per SELECT … WHERE id IN (...)
+FETCH_CHUNK_SIZE = 1000
+
+
+def cache_in_use() -> bool:
+    """
+    True when search hydrates through the cache. Payload ranking
+    never reads Postgres rows, so then the cache is dormant.
+    """
+    return settings.PRODUCT_CACHE_ENABLED and not settings.SEARCH_RANK_FROM_PAYLOAD
+
+
+class CachedProduct(NamedTuple):
+    id: str
+    title: str
+    description: Optional[str]
+    category: Optional[str]
+    price: Optional[float]
+    rating: Optional[float]
+    attributes: Any
+    click_count: Optional[int]
+    cart_count: Optional[int]
+    purchase_count: Optional[int]
+    total_dwell_time: Optional[float]
+    bounce_count: Optional[int]
+    behavior_score: Optional[float]
+    behavior_updated_at: Optional[datetime]
+
+
+# Product columns in CachedProduct field order
+_COLUMNS = [getattr(Product, field) for field in CachedProduct._fields]
+
+
+class ProductCache:
+    """
+    Bounded LRU of CachedProduct by product id, with TTL.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, lag_seconds: float = 0.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.lag_seconds = lag_seconds
+
+        # product_id → (expires_at, CachedProduct)
+        self._entries = OrderedDict()
+
+        # Ids of SELECTs in flight; invalidation removes ids from them
+        self._pending = []
+
+        # product_id → no caching until (monotonic), in deadline order
+        self._recently_invalidated = OrderedDict()
+        self._all_invalidated_until = 0.0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get_local(self, product_id: str) -> Optional[CachedProduct]:
+        entry = self._entries.get(product_id)
+        if entry is None:
+            return None
+
+        expires_at, product = entry
+        if expires_at < time.monotonic():
+            del self._entries[product_id]
+            return None
+
+        self._entries.move_to_end(product_id)
+        return product
+
+    def _cacheable(self, product_id: str, now: float) -> bool:
+        if now < self._all_invalidated_until:
+            return False
+        until = self._recently_invalidated.get(product_id)
+        return until is None or until <= now
+
+    def _put_local(self, product: CachedProduct):
+        self._entries[product.id] = (time.monotonic() + self.ttl_seconds, product)
+        self._entries.move_to_end(product.id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_many(self, db: AsyncSession, product_ids: list) -> list:
+        """
+        CachedProducts for `product_ids` (unknown ids are skipped),
+        fetching only the ids not cached.
+        """
+        found = {}
+        missing = []
+
+        for product_id in product_ids:
+            product = self._get_local(product_id)
+            if product is None:
+                missing.append(product_id)
+            else:
+                found[product_id] = product
+
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        for start in range(0, len(missing), FETCH_CHUNK_SIZE):
+            chunk = missing[start:start + FETCH_CHUNK_SIZE]
+            stmt = select(*_COLUMNS).where(Product.id.in_(chunk))
+            self.fetches += 1
+
+            # Ids invalidated while the SELECT is in flight leave this set
+            pending = set(chunk)
+            self._pending.append(pending)
+            try:
+                rows = (await db.execute(stmt)).all()
+            finally:
+                self._pending.remove(pending)
+
+            now = time.monotonic()
+            for row in rows:
+                product = CachedProduct(*row)
+                if product.id in pending and self._cacheable(product.id, now):
+                    self._put_local(product)
+                found[product.id] = product
+
+        return [found[product_id] for product_id in product_ids if product_id in found]
+
+    def invalidate(self, product_ids) -> None:
+        now = time.monotonic()
+        product_ids = list(product_ids)
+
+        for product_id in product_ids:
+            if self._entries.pop(product_id, None) is not None:
+                self.invalidations += 1
+
+        for pending in self._pending:
+            pending.difference_update(product_ids)
+
+        if self.lag_seconds > 0:
+            recent = self._recently_invalidated
+            while recent and next(iter(recent.values())) <= now:
+                recent.popitem(last=False)
+            for product_id in product_ids:
+                recent.pop(product_id, None)
+                recent[product_id] = now + self.lag_seconds
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+        for pending in self._pending:
+            pending.clear()
+
+        if self.lag_seconds > 0:
+            self._recently_invalidated.clear()
+            self._all_invalidated_until = time.monotonic() + self.lag_seconds
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "fetches": self.fetches,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Process-wide cache
+product_cache = ProductCache(
+    max_size=settings.PRODUCT_CACHE_SIZE,
+    ttl_seconds=settings.PRODUCT_CACHE_TTL_SECONDS,
+    # Search reads the replica → allow it to catch up before caching again
+    lag_seconds=settings.PRODUCT_CACHE_REPLICA_LAG_SECONDS if settings.READ_DATABASE_URL else 0.0
+)
+
+
+# --------------------------------------
+# Invalidation (Redis pub/sub)
+# --------------------------------------
+def _apply_message(data) -> None:
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+
+    if data == INVALIDATE_ALL:
+        product_cache.clear()
+    else:
+        product_cache.invalidate(json.loads(data))
+
+
+async def publish_invalidation(product_ids: list = None, redis_client=None):
+    """
+    Tell every API process to drop `product_ids` (None = everything).
+
+    Applied locally right away; failures are logged and ignored —
+    other processes then serve the old row until its TTL expires.
+    A no-op unless the cache is in use.
+    """
+    if not cache_in_use() or (product_ids is not None and not product_ids):
+        return
+
+    data = INVALIDATE_ALL if product_ids is None else json.dumps(list(product_ids))
+    _apply_message(data)
+
+    redis_client = redis_client or get_async_redis()
+    try:
+        await redis_client.publish(INVALIDATION_CHANNEL, data)
+    except (RedisError, OSError) as e:
+        print(f"⚠️ Could not publish product invalidation: {e}")
+
+
+async def run_invalidation_listener(retry_seconds: float = 1.0):
+    """
+    Apply invalidation messages until cancelled (started in the
+    FastAPI lifespan). Reconnects after errors, clearing the cache
+    since messages may have been missed.
+    """
+    while True:
+        pubsub = get_async_redis().pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _apply_message(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ Product invalidation listener failed ({e}); reconnecting")
+            product_cache.clear()
+            await asyncio.sleep(retry_seconds)
+        finally:
+            await pubsub.aclose()
@@ -0,0 +1,565 @@
+# src/services/qdrant_backend.py
+"""
+Qdrant vector backend (VECTOR_BACKEND=qdrant). Used through
+src.services.vector_service.
+
+Handles all Qdrant vector database operations:
+- Create versioned collections + swap the live alias
+- Insert product embeddings
+- Perform vector search
+
+All operations go through one application-scoped AsyncQdrantClient,
+so requests share pooled connections and never block the event loop.
+
+Reads and writes target an alias (COLLECTION_NAME) that points at
+a versioned collection, so a reindex can build a new collection
+next to the live one and switch over atomically.
+
+Index layout (HNSW m / ef_construct, quantization, on-disk vectors)
+comes from settings when a collection is created; each search picks
+a mode (exact / fast / balanced) that trades recall for latency.
+"""
+
+import asyncio
+import time
+import uuid
+import httpx
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as qmodels
+from qdrant_client.http.exceptions import UnexpectedResponse
+from src.core.config import settings
+from src.models.schemas import SearchFilters
+
+# Alias that always points at the live versioned collection
+COLLECTION_NAME = settings.QDRANT_COLLECTION_ALIAS
+
+# Payload fields used in search filters → index type
+PAYLOAD_INDEXES = {
+    "category": qmodels.PayloadSchemaType.KEYWORD,
+    "price": qmodels.PayloadSchemaType.FLOAT,
+    "rating": qmodels.PayloadSchemaType.FLOAT,
+}
+
+# Search modes → recall / latency trade-off
+SEARCH_MODES = ("exact", "fast", "balanced")
+
+# Upper bound for the readiness check, so a hung Qdrant fails fast
+READY_CHECK_TIMEOUT_SECONDS = 2.0
+
+# Shared client, opened in the FastAPI lifespan (or lazily by scripts/workers)
+_client = None
+
+
+def get_qdrant_client():
+    """
+    Returns the shared AsyncQdrantClient connected to Qdrant.
+
+    The client is created once per process with a pooled HTTP
+    transport (or gRPC when QDRANT_PREFER_GRPC is set).
+    """
+    global _client
+
+    if _client is None:
+        _client = AsyncQdrantClient(
+            host=settings.QDRANT_HOST,
+            port=settings.QDRANT_PORT,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            prefer_grpc=settings.QDRANT_PREFER_GRPC,
+            timeout=settings.QDRANT_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.QDRANT_POOL_SIZE,
+                max_keepalive_connections=settings.QDRANT_POOL_SIZE
+            )
+        )
+
+    return _client
+
+
+async def close_qdrant_client():
+    """
+    Closes the shared client and its connection pool.
+    """
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def hnsw_config():
+    return qmodels.HnswConfigDiff(
+        m=settings.QDRANT_HNSW_M,
+        ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT
+    )
+
+
+def quantization_config():
+    """
+    Quantization from QDRANT_QUANTIZATION, or None.
+
+    - scalar:  float32 → int8 per dimension (4x smaller, small recall loss)
+    - product: sub-vector codebooks (x4 … x64 smaller, larger recall loss)
+
+    Original vectors are kept for rescoring (on disk when
+    QDRANT_ON_DISK_VECTORS is set).
+    """
+    kind = settings.QDRANT_QUANTIZATION
+
+    if kind == "none":
+        return None
+
+    if kind == "scalar":
+        return qmodels.ScalarQuantization(
+            scalar=qmodels.ScalarQuantizationConfig(
+                type=qmodels.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=settings.QDRANT_QUANTIZATION_ALWAYS_RAM
+            )
+        )
+
+    if kind == "product":
+        return qmodels.ProductQuantization(
+            product=qmodels.ProductQuantizationConfig(
+                compression=qmodels.CompressionRatio(settings.QDRANT_PQ_COMPRESSION),
+                always_ram=settings.QDRANT_QUANTIZATION_ALWAYS_RAM
+            )
+        )
+
+    raise ValueError(f"Unknown QDRANT_QUANTIZATION {kind!r}, expected none | scalar | product")
+
+
+def search_params(mode: str = None):
+    """
+    Map a search mode to Qdrant SearchParams.
+
+    - exact:    brute-force scan over original vectors (recall 1.0, slowest)
+    - fast:     small hnsw_ef, quantized scores without rescoring
+    - balanced: larger hnsw_ef, quantized candidates oversampled and
+                rescored with the original vectors
+    """
+    mode = mode or settings.SEARCH_MODE_DEFAULT
+    quantized = settings.QDRANT_QUANTIZATION != "none"
+
+    if mode == "exact":
+        return qmodels.SearchParams(
+            exact=True,
+            quantization=qmodels.QuantizationSearchParams(ignore=True) if quantized else None
+        )
+
+    if mode == "fast":
+        return qmodels.SearchParams(
+            hnsw_ef=settings.SEARCH_HNSW_EF_FAST,
+            quantization=qmodels.QuantizationSearchParams(rescore=False) if quantized else None
+        )
+
+    if mode == "balanced":
+        return qmodels.SearchParams(
+            hnsw_ef=settings.SEARCH_HNSW_EF_BALANCED,
+            quantization=qmodels.QuantizationSearchParams(
+                rescore=True,
+                oversampling=settings.SEARCH_RESCORE_OVERSAMPLING
+            ) if quantized else None
+        )
+
+    raise ValueError(f"Unknown search mode {mode!r}, expected one of {SEARCH_MODES}")
+
+
+def new_collection_name() -> str:
+    """
+    Name for a fresh versioned collection, e.g.
+    products_v1718000000123_3f2a9c1d (ms + random suffix, so workers
+    starting together or rebuilds in the same second never collide).
+    """
+    return f"{COLLECTION_NAME}_v{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
+
+
+async def create_versioned_collection(collection_name: str):
+    """
+    Create a new collection with the current vector schema, index
+    settings and payload indexes. Does not touch the live alias.
+    """
+    client = get_qdrant_client()
+
+    # Single unnamed vector field (OLD API format)
+    await client.create_collection(
+        collection_name=collection_name,
+        vectors_config=qmodels.VectorParams(
+            size=settings.EMBEDDING_DIM,       # Must match embedding model dim
+            distance=qmodels.Distance.COSINE,  # Cosine similarity for search
+            on_disk=settings.QDRANT_ON_DISK_VECTORS
+        ),
+        hnsw_config=hnsw_config(),
+        quantization_config=quantization_config()
+    )
+
+    # Index filterable payload fields so filtered search stays fast
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        await client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=field_schema
+        )
+
+
+async def get_alias_target():
+    """
+    Returns the collection the live alias points at, or None.
+    """
+    client = get_qdrant_client()
+
+    aliases = (await client.get_aliases()).aliases
+    for alias in aliases:
+        if alias.alias_name == COLLECTION_NAME:
+            return alias.collection_name
+
+    return None
+
+
+async def swap_alias(collection_name: str):
+    """
+    Atomically point the live alias at `collection_name`.
+
+    Returns:
+        Name of the previously live collection (or None)
+    """
+    client = get_qdrant_client()
+    previous = await get_alias_target()
+
+    operations = []
+    if previous is not None:
+        operations.append(
+            qmodels.DeleteAliasOperation(
+                delete_alias=qmodels.DeleteAlias(alias_name=COLLECTION_NAME)
+            )
+        )
+    operations.append(
+        qmodels.CreateAliasOperation(
+            create_alias=qmodels.CreateAlias(
+                collection_name=collection_name,
+                alias_name=COLLECTION_NAME
+            )
+        )
+    )
+
+    # Both operations are applied in one request → no window without an alias
+    await client.update_collection_aliases(change_aliases_operations=operations)
+
+    return previous
+
+
+async def init_vector_store():
+    """
+    Opens the shared client and verifies the live collection.
+    """
+    get_qdrant_client()
+    await init_qdrant_collection()
+
+
+async def close_vector_store():
+    await close_qdrant_client()
+
+
+async def vector_store_ready() -> bool:
+    """
+    True when Qdrant answers for the live collection.
+    """
+    try:
+        await asyncio.wait_for(
+            get_qdrant_client().get_collection(COLLECTION_NAME),
+            READY_CHECK_TIMEOUT_SECONDS
+        )
+        return True
+    except Exception:
+        return False
+
+
+async def delete_collection(collection_name: str):
+    await get_qdrant_client().delete_collection(collection_name)
+
+
+async def _create_first_collection() -> str:
+    """
+    Fresh install: create a versioned collection and point the alias
+    at it. Workers starting together all race here; the alias is
+    only created, never moved, so the first one wins and the others
+    drop their collection and use the winner's.
+
+    Returns:
+        Collection the alias points at
+    """
+    client = get_qdrant_client()
+
+    collection_name = new_collection_name()
+    await create_versioned_collection(collection_name)
+
+    try:
+        # Create-only (no DeleteAlias) → fails if another process set it
+        await client.update_collection_aliases(change_aliases_operations=[
+            qmodels.CreateAliasOperation(
+                create_alias=qmodels.CreateAlias(
+                    collection_name=collection_name,
+                    alias_name=COLLECTION_NAME
+                )
+            )
+        ])
+    except UnexpectedResponse as e:
+        print(f"ℹ️ Alias '{COLLECTION_NAME}' not created ({e.status_code}); re-reading it.")
+
+    target = await get_alias_target()
+    if target == collection_name:
+        print(f"✅ Created collection {target} behind alias '{COLLECTION_NAME}'.")
+        return target
+
+    await client.delete_collection(collection_name)
+    if target is None:
+        raise RuntimeError(f"Could not create alias '{COLLECTION_NAME}' for collection {collection_name}.")
+
+    print(f"ℹ️ Alias '{COLLECTION_NAME}' was created by another process → using {target}.")
+    return target
+
+
+async def init_qdrant_collection():
+    """
+    Verifies the live collection at startup. Never deletes data.
+
+    - No alias yet (fresh install): create a first versioned
+      collection and point the alias at it (safe when several
+      workers start at once).
+    - Alias exists: check the vector size matches EMBEDDING_DIM
+      and add any missing payload indexes.
+
+    Rebuilding the index is a separate job (rebuild_index.py).
+    """
+    client = get_qdrant_client()
+
+    target = await get_alias_target()
+
+    if target is None:
+        await _create_first_collection()
+        return
+
+    info = await client.get_collection(COLLECTION_NAME)
+
+    vectors = info.config.params.vectors
+    if vectors.size != settings.EMBEDDING_DIM:
+        raise RuntimeError(
+            f"Collection {target} has vector size {vectors.size}, "
+            f"expected EMBEDDING_DIM={settings.EMBEDDING_DIM}. "
+            "Run `python rebuild_index.py` to build a matching collection."
+        )
+
+    hnsw = info.config.hnsw_config
+    if (hnsw.m, hnsw.ef_construct) != (settings.QDRANT_HNSW_M, settings.QDRANT_HNSW_EF_CONSTRUCT) \
+            or bool(info.config.quantization_config) != (settings.QDRANT_QUANTIZATION != "none"):
+        # Index layout only changes through a blue/green rebuild
+        print(f"⚠️ Collection {target} was built with different HNSW / quantization "
+              "settings. Run `python rebuild_index.py` to apply the current ones.")
+
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        if field_name not in (info.payload_schema or {}):
+            await client.create_payload_index(
+                collection_name=COLLECTION_NAME,
+                field_name=field_name,
+                field_schema=field_schema
+            )
+
+    print(f"✅ Collection {target} verified behind alias '{COLLECTION_NAME}'.")
+
+
+def build_qdrant_filter(filters: SearchFilters = None):
+    """
+    Translate search filters into a Qdrant payload filter.
+
+    Returns None when no filter is set, so unfiltered searches
+    skip filtering entirely.
+    """
+    if filters is None:
+        return None
+
+    conditions = []
+
+    if filters.category is not None:
+        conditions.append(
+            qmodels.FieldCondition(
+                key="category",
+                match=qmodels.MatchValue(value=filters.category)
+            )
+        )
+
+    if filters.price_min is not None or filters.price_max is not None:
+        conditions.append(
+            qmodels.FieldCondition(
+                key="price",
+                range=qmodels.Range(gte=filters.price_min, lte=filters.price_max)
+            )
+        )
+
+    if filters.rating_min is not None:
+        conditions.append(
+            qmodels.FieldCondition(
+                key="rating",
+                range=qmodels.Range(gte=filters.rating_min)
+            )
+        )
+
+    if not conditions:
+        return None
+
+    return qmodels.Filter(must=conditions)
+
+
+async def vector_upsert(product_id: str, vector: list, payload: dict):
+    """
+    Insert/Update a vector embedding into Qdrant.
+
+    Args:
+        product_id: Unique product UUID (also used as point ID)
+        vector: Embedding list (length = EMBEDDING_DIM)
+        payload: Metadata stored along with the vector
+    """
+    client = get_qdrant_client()
+
+    await client.upsert(
+        collection_name=COLLECTION_NAME,
+        points=[
+            qmodels.PointStruct(
+                id=product_id,                 # Using product DB ID for consistency
+                vector=vector,                 # OLD API → must use `vector=` field
+                payload={**payload, "product_id": product_id}
+            )
+        ]
+    )
+
+
+async def vector_upsert_batch(points: list, batch_size: int = None, collection_name: str = None):
+    """
+    Insert/Update many vector embeddings into Qdrant.
+
+    Sends the points in chunks of `batch_size`, so a large catalog
+    costs a handful of HTTP round trips instead of one per product.
+
+    Args:
+        points: List of (product_id, vector, payload) tuples
+        batch_size: Points per upsert request (default from settings)
+        collection_name: Target collection (default: the live alias)
+    """
+    client = get_qdrant_client()
+    batch_size = batch_size or settings.INGEST_UPSERT_BATCH_SIZE
+    collection_name = collection_name or COLLECTION_NAME
+
+    for start in range(0, len(points), batch_size):
+        chunk = points[start:start + batch_size]
+
+        await client.upsert(
+            collection_name=collection_name,
+            points=[
+                qmodels.PointStruct(
+                    id=product_id,
+                    vector=vector,
+                    payload={**payload, "product_id": product_id}
+                )
+                for product_id, vector, payload in chunk
+            ]
+        )
+
+
+async def vector_set_payloads(payloads: dict, batch_size: int = None):
+    """
+    Merge per-point payload updates into Qdrant.
+
+    All updates of a chunk go out as one batch request instead of
+    one `set_payload` call per point. Each request waits until
+    Qdrant has applied it, so a caller that bumps the behavior
+    version afterwards never lets a search cache pre-update ranks
+    under the new version.
+
+    Args:
+        payloads: Mapping of product_id → partial payload to set
+        batch_size: Points per batch request (default from settings)
+    """
+    client = get_qdrant_client()
+    batch_size = batch_size or settings.INGEST_UPSERT_BATCH_SIZE
+    items = list(payloads.items())
+
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+
+        await client.batch_update_points(
+            collection_name=COLLECTION_NAME,
+            update_operations=[
+                qmodels.SetPayloadOperation(
+                    set_payload=qmodels.SetPayload(payload=payload, points=[product_id])
+                )
+                for product_id, payload in chunk
+            ],
+            wait=True
+        )
+
+
+async def vector_search(
+    query_vector: list,
+    limit: int = 5,
+    filters: SearchFilters = None,
+    mode: str = None,
+    collection_name: str = None
+):
+    """
+    Performs vector similarity search inside Qdrant.
+
+    Args:
+        query_vector: Embedding of the search text
+        limit: How many similar products to return
+        filters: Optional category / price / rating filters,
+                 applied inside Qdrant (exact `limit` hits)
+        mode: exact | fast | balanced (default SEARCH_MODE_DEFAULT)
+        collection_name: Target collection (default: the live alias)
+
+    Returns:
+        List of ScoredPoint objects
+    """
+    client = get_qdrant_client()
+
+    response = await client.query_points(
+        collection_name=collection_name or COLLECTION_NAME,
+        query=query_vector,           # Vector to search against
+        query_filter=build_qdrant_filter(filters),
+        search_params=search_params(mode),
+        limit=limit,
+        with_payload=True
+    )
+
+    return response.points
+
+
+async def vector_search_batch(
+    query_vectors: list,
+    limit: int = 5,
+    filters: SearchFilters = None,
+    mode: str = None,
+    collection_name: str = None
+):
+    """
+    Several searches in one request (same filters / mode).
+
+    Returns:
+        One list of ScoredPoint objects per query vector
+    """
+    client = get_qdrant_client()
+    query_filter = build_qdrant_filter(filters)
+    params = search_params(mode)
+
+    responses = await client.query_batch_points(
+        collection_name=collection_name or COLLECTION_NAME,
+        requests=[
+            qmodels.QueryRequest(
+                query=query_vector,
+                filter=query_filter,
+                params=params,
+                limit=limit,
+                with_payload=True
+            )
+            for query_vector in query_vectors
+        ]
+    )
+
+    return [response.points for response in responses]
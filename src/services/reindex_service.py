@@ -0,0 +1,147 @@
+# src/services/reindex_service.py
+"""
+Blue/green reindexing of the product vector index.
+
+1. Create a new versioned collection next to the live one
+2. Stream all products from Postgres into it in batches
+3. Atomically swap the live alias to the new collection
+4. Catch up on products written (or whose behavior counters
+   changed) while the rebuild was running
+5. Drop the previous collection (optional)
+
+Search keeps serving from the old collection until step 3.
+
+Vectors of unchanged products come from the embedding store, so a
+reindex only runs the model for new or edited texts.
+"""
+
+import time
+from datetime import datetime
+from sqlalchemy import or_, select
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.models.product import Product
+from src.services.ingestion_service import IngestionService, product_payload
+from src.services.result_cache import CATALOG_VERSION_KEY, bump_version
+from src.services.vector_service import (
+    new_collection_name,
+    create_versioned_collection,
+    swap_alias,
+    vector_upsert_batch,
+    delete_collection,
+)
+
+
+class ReindexService:
+    """
+    Rebuilds the vector index from Postgres without downtime.
+    """
+
+    @staticmethod
+    async def _stream_into(collection_name: str, batch_size: int, since: datetime = None) -> int:
+        """
+        Keyset-paginate products (by id) and index them batch by batch,
+        so memory stays bounded regardless of catalog size.
+
+        Args:
+            collection_name: Target collection
+            batch_size: Products per batch
+            since: Only products whose row or behavior counters were
+                   updated at/after this time
+
+        Returns:
+            Number of products indexed
+        """
+        indexed = 0
+        last_id = None
+
+        async with AsyncSessionLocal() as db:
+            while True:
+                stmt = select(Product).order_by(Product.id).limit(batch_size)
+                if last_id is not None:
+                    stmt = stmt.where(Product.id > last_id)
+                if since is not None:
+                    # The event worker's counter updates only set
+                    # behavior_updated_at (its processing time)
+                    stmt = stmt.where(or_(
+                        Product.updated_at >= since,
+                        Product.behavior_updated_at >= since
+                    ))
+
+                products = (await db.execute(stmt)).scalars().all()
+                if not products:
+                    break
+
+                embeddings = await IngestionService.embed_products(products, db)
+
+                await vector_upsert_batch(
+                    [
+                        (p.id, embedding, product_payload(p))
+                        for p, embedding in zip(products, embeddings)
+                    ],
+                    collection_name=collection_name
+                )
+
+                indexed += len(products)
+                last_id = products[-1].id
+
+                # Release ORM objects of the finished batch
+                db.expunge_all()
+
+                print(f"   … {indexed} products indexed into {collection_name}")
+
+        return indexed
+
+    @staticmethod
+    async def rebuild(batch_size: int = None, drop_old: bool = None) -> dict:
+        """
+        Build a fresh collection from Postgres and swap it live.
+
+        Args:
+            batch_size: Products per batch (default REINDEX_BATCH_SIZE)
+            drop_old: Delete the previous collection after the swap
+                      (default REINDEX_DROP_OLD)
+
+        Returns:
+            Summary of the rebuild
+        """
+        batch_size = batch_size or settings.REINDEX_BATCH_SIZE
+        drop_old = settings.REINDEX_DROP_OLD if drop_old is None else drop_old
+
+        started = time.perf_counter()
+        started_at = datetime.utcnow()
+
+        # STEP 1 — New versioned collection (live alias untouched)
+        collection_name = new_collection_name()
+        await create_versioned_collection(collection_name)
+        print(f"🔄 Reindexing into {collection_name}...")
+
+        # STEP 2 — Stream every product into it
+        indexed = await ReindexService._stream_into(collection_name, batch_size)
+
+        # STEP 3 — Atomic alias swap
+        previous = await swap_alias(collection_name)
+        print(f"🔀 Alias now points at {collection_name} (was {previous}).")
+
+        # STEP 4 — Products created/updated during the rebuild, and
+        # behavior payloads the event worker pushed meanwhile, went to
+        # the old collection; replay them into the new one.
+        caught_up = await ReindexService._stream_into(
+            collection_name, batch_size, since=started_at
+        )
+
+        await bump_version(CATALOG_VERSION_KEY)
+
+        # STEP 5 — Drop the old collection
+        if previous is not None and drop_old:
+            await delete_collection(previous)
+            print(f"🗑 Deleted previous collection {previous}.")
+
+        return {
+            "collection": collection_name,
+            "previous": previous,
+            "indexed": indexed,
+            "caught_up": caught_up,
+            "seconds": round(time.perf_counter() - started, 2)
+        }
@@ -0,0 +1,215 @@
+# src/services/result_cache.py
+"""
+Versioned cache for full hybrid-search responses.
+
+Keyed by normalized query + filters + limit + search mode + the current catalog
+and behavior version stamps. Ingestion bumps the catalog version,
+the event worker bumps the behavior version; a bump changes every
+key, so old entries are simply never read again.
+
+Tier 1: in-process LRU (front layer).
+Tier 2: Redis, shared by every worker.
+
+Version stamps are re-read from Redis at most every
+SEARCH_CACHE_VERSION_CHECK_SECONDS, which bounds how long a cached
+response can outlive a catalog or behavior change.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.embedding_cache import normalize_query
+from src.core.redis_client import get_async_redis
+from src.models.schemas import SearchFilters
+
+CATALOG_VERSION_KEY = "search:version:catalog"
+BEHAVIOR_VERSION_KEY = "search:version:behavior"
+
+
+async def bump_version(key: str, redis_client=None):
+    """
+    Invalidate cached search responses by bumping a version stamp.
+
+    Failures are logged and ignored — a missed bump only delays
+    invalidation until the entry TTL expires.
+    """
+    redis_client = redis_client or get_async_redis()
+
+    try:
+        await redis_client.incr(key)
+    except (RedisError, OSError) as e:
+        print(f"⚠️ Could not bump {key}: {e}")
+
+
+class SearchResultCache:
+    """
+    Two-tier, version-stamped cache of SearchService responses.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        version_check_seconds: float,
+        redis_enabled: bool = True
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.version_check_seconds = version_check_seconds
+        self.redis_enabled = redis_enabled
+
+        # key → (expires_at, results)
+        self._entries = OrderedDict()
+
+        # Last read version stamps: (catalog, behavior), read at
+        self._versions = None
+        self._versions_read_at = 0.0
+
+        # Counters
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses = 0
+        self.redis_errors = 0
+
+    # --------------------------------------
+    # Versions + keys
+    # --------------------------------------
+    async def _current_versions(self):
+        """
+        Returns (catalog, behavior) version stamps, or None when they
+        cannot be read (the cache is then bypassed).
+        """
+        now = time.monotonic()
+        if self._versions is not None and now - self._versions_read_at < self.version_check_seconds:
+            return self._versions
+
+        try:
+            catalog, behavior = await get_async_redis().mget(CATALOG_VERSION_KEY, BEHAVIOR_VERSION_KEY)
+        except (RedisError, OSError):
+            self.redis_errors += 1
+            self._versions = None
+            return None
+
+        self._versions = (int(catalog or 0), int(behavior or 0))
+        self._versions_read_at = now
+        return self._versions
+
+    @staticmethod
+    def make_key(query: str, filters: SearchFilters, limit: int, versions: tuple, mode: str = None) -> str:
+        raw = json.dumps(
+            {
+                "q": normalize_query(query),
+                "f": filters.model_dump(),
+                "l": limit,
+                "m": mode,
+                "v": versions,
+            },
+            sort_keys=True
+        )
+        return "search:result:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # --------------------------------------
+    # Tier 1 — in-process LRU
+    # --------------------------------------
+    def _get_local(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, results = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return results
+
+    def _put_local(self, key: str, results: list):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, results)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # --------------------------------------
+    # Public API
+    # --------------------------------------
+    async def key_for(self, query: str, filters: SearchFilters, limit: int, mode: str = None) -> Optional[str]:
+        """
+        Cache key for a search under the current version stamps, or
+        None when the versions are unknown (cache bypassed).
+
+        The same key is used for lookup and store, so a response
+        computed before a version bump is never stored under the
+        newer version.
+        """
+        versions = await self._current_versions()
+        if versions is None:
+            self.bypasses += 1
+            return None
+
+        return self.make_key(query, filters, limit, versions, mode)
+
+    async def get(self, key: str) -> Optional[list]:
+        results = self._get_local(key)
+        if results is not None:
+            self.memory_hits += 1
+            return results
+
+        if self.redis_enabled:
+            try:
+                raw = await get_async_redis().get(key)
+            except (RedisError, OSError):
+                self.redis_errors += 1
+                raw = None
+
+            if raw is not None:
+                results = json.loads(raw)
+                self._put_local(key, results)
+                self.redis_hits += 1
+                return results
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, results: list):
+        self._put_local(key, results)
+
+        if self.redis_enabled:
+            try:
+                await get_async_redis().set(key, json.dumps(results), ex=max(1, int(self.ttl_seconds)))
+            except (RedisError, OSError, TypeError):
+                self.redis_errors += 1
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bypasses": self.bypasses,
+            "redis_errors": self.redis_errors,
+            "versions": self._versions,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else None
+        }
+
+
+# Process-wide cache instance
+search_result_cache = SearchResultCache(
+    max_size=settings.SEARCH_CACHE_SIZE,
+    ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+    version_check_seconds=settings.SEARCH_CACHE_VERSION_CHECK_SECONDS,
+    redis_enabled=settings.SEARCH_CACHE_REDIS_ENABLED
+)
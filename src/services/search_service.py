@@ -1,27 +1,39 @@
 # src/services/search_service.py
 """
 Search service responsible for:
+0. Serving repeated searches from the versioned response cache,
+   and later pages from a ranked-list snapshot (cursor pagination)
 1. Creating embeddings for user queries
-2. Running vector similarity search in Qdrant
-3. Fetching matching products from the database
-4. Applying optional filters
-5. Re-ranking results using behavioral signals
+2. Running filtered vector similarity search in Qdrant
+3. Fetching matching products (only when ranking from the vector
+   payload is disabled), through the in-process product cache
+4. Re-ranking results using behavioral signals
 """
 
+import uuid
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from src.models.product import Product
-from src.core.embeddings import generate_local_embedding
+from src.models.schemas import SearchFilters
+from src.core.embeddings import get_query_embedding
 from src.services.vector_service import vector_search
-from src.services.learning_service import apply_behavioral_ranking
+from src.services.learning_service import apply_behavioral_ranking, apply_payload_ranking
+from src.services.result_cache import search_result_cache
+from src.services.search_snapshot import decode_cursor, encode_cursor, search_snapshots
+from src.services.product_cache import cache_in_use, product_cache
+from src.core.config import settings
+from src.core.metrics import stage
 
 
 class SearchService:
     """
     Orchestrates the entire search pipeline:
+    - Cursor pagination
+    - Response cache
     - Embedding
-    - Vector search
-    - DB filtering
+    - Filtered vector search
+    - DB hydration
     - Behavioral re-ranking
     """
 
@@ -33,7 +45,8 @@ class SearchService:
         price_min: float = None,
         price_max: float = None,
         rating_min: float = None,
-        limit: int = 10
+        limit: int = 10,
+        mode: str = None
     ):
         """
         Executes a complete product search workflow.
@@ -45,16 +58,151 @@ class SearchService:
             price_min/max: Optional price filters
             rating_min: Optional rating filter
             limit: Number of results to return
+            mode: ANN search mode — exact | fast | balanced
 
         Returns:
             Ranked list of Product objects with additional scoring metadata
         """
+        results, _ = await SearchService.search_page(
+            db, query, category, price_min, price_max, rating_min, limit=limit, mode=mode
+        )
+        return results
 
-        # STEP 1 — Convert query text to embedding vector
-        query_embedding = generate_local_embedding(query)
+    @staticmethod
+    async def search_page(
+        db: AsyncSession,
+        query: str = None,
+        category: str = None,
+        price_min: float = None,
+        price_max: float = None,
+        rating_min: float = None,
+        limit: int = 10,
+        mode: str = None,
+        cursor: str = None
+    ):
+        """
+        One page of search results plus the cursor of the next page.
+
+        Without a cursor, the first SEARCH_PAGINATION_DEPTH results
+        are ranked once and snapshotted in Redis. With a cursor, the
+        page is read from that snapshot (query / filter arguments are
+        taken from the cursor). An expired snapshot is rebuilt from
+        the query stored in the cursor.
 
-        # STEP 2 — Retrieve similar products from Qdrant
-        qdrant_results = await vector_search(query_embedding, limit=limit)
+        Raises:
+            InvalidCursor: malformed cursor
+
+        Returns:
+            (results, next_cursor) — next_cursor is None on the last page
+        """
+        offset = 0
+
+        if cursor is not None:
+            state = decode_cursor(cursor)
+            offset = state["o"]
+
+            with stage("search", "snapshot"):
+                page = await search_snapshots.page(state["s"], offset, limit)
+            if page is not None:
+                results, total = page
+                return results, SearchService._next_cursor(state, offset + len(results), total)
+
+            # Snapshot expired → recompute from the query in the cursor
+            query = state["q"]
+            filters = SearchFilters(**state["f"])
+            mode = state.get("m")
+        else:
+            filters = SearchFilters(
+                category=category,
+                price_min=price_min,
+                price_max=price_max,
+                rating_min=rating_min
+            )
+
+        mode = mode or settings.SEARCH_MODE_DEFAULT
+        depth = max(limit, settings.SEARCH_PAGINATION_DEPTH)
+
+        ranked, snapshot_id = await SearchService._ranked(db, query, filters, depth, mode)
+        results = ranked[offset:offset + limit]
+
+        state = {"s": snapshot_id, "q": query, "f": filters.model_dump(), "m": mode}
+        next_cursor = SearchService._next_cursor(state, offset + len(results), len(ranked))
+
+        if next_cursor is not None:
+            with stage("search", "snapshot"):
+                await search_snapshots.save(snapshot_id, ranked)
+
+        return results, next_cursor
+
+    @staticmethod
+    def _next_cursor(state: dict, offset: int, total: int):
+        if offset >= total:
+            return None
+        return encode_cursor({**state, "o": offset})
+
+    @staticmethod
+    async def _ranked(
+        db: AsyncSession,
+        query: str,
+        filters: SearchFilters,
+        depth: int,
+        mode: str
+    ):
+        """
+        Ranked list of the top `depth` results, served from the
+        response cache when possible.
+
+        Returns:
+            (ranked, snapshot_id) — the snapshot id is derived from
+            the cache key, so identical searches under the same
+            version stamps share one snapshot.
+        """
+        cache_key = None
+        cached = None
+
+        with stage("search", "cache"):
+            if settings.SEARCH_CACHE_ENABLED:
+                cache_key = await search_result_cache.key_for(query, filters, depth, mode)
+            if cache_key is not None:
+                cached = await search_result_cache.get(cache_key)
+
+        snapshot_id = cache_key.rsplit(":", 1)[-1] if cache_key else uuid.uuid4().hex
+
+        if cached is not None:
+            return cached, snapshot_id
+
+        ranked = await SearchService._search_uncached(db, query, filters, depth, mode)
+
+        if cache_key is not None:
+            with stage("search", "cache"):
+                await search_result_cache.set(cache_key, ranked)
+
+        return ranked, snapshot_id
+
+    @staticmethod
+    async def _search_uncached(
+        db: AsyncSession,
+        query: str,
+        filters: SearchFilters,
+        limit: int,
+        mode: str = None
+    ):
+        """
+        The full pipeline: embed → filtered vector search → rank.
+        """
+
+        # STEP 1 — Convert query text to embedding vector (cached)
+        with stage("search", "embedding"):
+            query_embedding = await get_query_embedding(query)
+
+        # STEP 2 — Retrieve a wider candidate pool from Qdrant, so
+        # behavior can promote items just below the similarity top-k.
+        # Filters are applied inside Qdrant, so every hit already matches.
+        pool_size = max(limit, settings.SEARCH_CANDIDATE_POOL)
+        with stage("search", "qdrant"):
+            qdrant_results = await vector_search(
+                query_embedding, limit=pool_size, filters=filters, mode=mode
+            )
 
         # Extract product IDs and similarity scores
         candidate_ids = [str(hit.id) for hit in qdrant_results]
@@ -63,27 +211,26 @@ class SearchService:
         if not candidate_ids:
             return []
 
-        # STEP 3 — Fetch matching product objects from DB
-        stmt = select(Product).where(Product.id.in_(candidate_ids))
-        products = (await db.execute(stmt)).scalars().all()
-
-        # STEP 4 — Apply all optional filters
-        filtered = []
-        for p in products:
-            if category and p.category != category:
-                continue
-            if price_min and p.price < price_min:
-                continue
-            if price_max and p.price > price_max:
-                continue
-            if rating_min and p.rating < rating_min:
-                continue
-            filtered.append(p)
-
-        # STEP 5 — Apply behavior + similarity combined ranking
+        # Hot path — the payload already carries product fields and a
+        # precomputed behavior score, so rank without touching Postgres.
+        if settings.SEARCH_RANK_FROM_PAYLOAD:
+            with stage("search", "ranking"):
+                return apply_payload_ranking(qdrant_results, limit)
+
+        # STEP 3 — Fetch matching products; cached rows cost no
+        # round trip, only the missing ids are read from the DB
+        with stage("search", "postgres"):
+            if cache_in_use():
+                products = await product_cache.get_many(db, candidate_ids)
+            else:
+                stmt = select(Product).where(Product.id.in_(candidate_ids))
+                products = (await db.execute(stmt)).scalars().all()
+
+        # STEP 4 — Apply behavior + similarity combined ranking
         # The ranking function enhances relevance based on:
         # - similarity score (from vector search)
         # - user behavior signals (clicks, purchases, dwell time, bounce)
-        ranked = apply_behavioral_ranking(filtered, similarity_map)
+        with stage("search", "ranking"):
+            ranked = apply_behavioral_ranking(products, similarity_map, limit)
 
         return ranked
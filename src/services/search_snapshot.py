@@ -0,0 +1,153 @@
+# src/services/search_snapshot.py
+"""
+Ranked-result snapshots for cursor pagination.
+
+The first page of a search ranks SEARCH_PAGINATION_DEPTH results
+once and stores them as a Redis list (one JSON item per element,
+with a TTL). Later pages are an LRANGE on that list — O(page size),
+no re-embedding, vector search or re-ranking.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON
+object carrying the snapshot id, the next offset and the original
+query / filters / mode, so a page can be recomputed when the
+snapshot has expired.
+"""
+
+import base64
+import binascii
+import json
+from typing import Optional
+
+from pydantic import ValidationError
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.redis_client import get_async_redis
+from src.models.schemas import SearchFilters
+from src.services.vector_service import SEARCH_MODES
+
+SNAPSHOT_KEY_PREFIX = "search:snapshot:"
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised for a cursor that was not produced by `encode_cursor`.
+    """
+
+
+def encode_cursor(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode and validate a cursor. Cursors come back from clients,
+    so every field is checked before use (`f` must be valid
+    SearchFilters fields).
+
+    Raises InvalidCursor for a cursor that was not produced by
+    `encode_cursor`.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if not isinstance(state, dict) or not {"s", "o", "q", "f"} <= state.keys():
+        raise InvalidCursor("Malformed cursor")
+    if isinstance(state["o"], bool) or not isinstance(state["o"], int) or state["o"] < 0:
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(state["s"], str) or not isinstance(state["q"], str):
+        raise InvalidCursor("Malformed cursor")
+    if state.get("m") is not None and state["m"] not in SEARCH_MODES:
+        raise InvalidCursor("Malformed cursor")
+
+    filters = state["f"]
+    if not isinstance(filters, dict) or not filters.keys() <= SearchFilters.model_fields.keys():
+        raise InvalidCursor("Malformed cursor")
+    try:
+        state["f"] = SearchFilters(**filters).model_dump()
+    except ValidationError as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    return state
+
+
+class SearchSnapshotStore:
+    """
+    Redis lists of ranked results, keyed by snapshot id.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+        # Counters
+        self.saves = 0
+        self.reuses = 0
+        self.page_hits = 0
+        self.expired = 0
+        self.redis_errors = 0
+
+    async def save(self, snapshot_id: str, results: list):
+        """
+        Store a ranked list. A snapshot that already exists (same
+        query under the same version stamps) is reused as is.
+
+        Failures are counted and ignored — later pages then fall
+        back to recomputing.
+        """
+        redis_client = get_async_redis()
+        key = SNAPSHOT_KEY_PREFIX + snapshot_id
+
+        try:
+            if await redis_client.exists(key):
+                self.reuses += 1
+                return
+
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.rpush(key, *[json.dumps(item, default=str) for item in results])
+            pipe.expire(key, max(1, int(self.ttl_seconds)))
+            await pipe.execute()
+            self.saves += 1
+        except (RedisError, OSError):
+            self.redis_errors += 1
+
+    async def page(self, snapshot_id: str, offset: int, size: int):
+        """
+        Returns (items, total) for one page, or None when the
+        snapshot expired or cannot be read.
+        """
+        key = SNAPSHOT_KEY_PREFIX + snapshot_id
+
+        try:
+            pipe = get_async_redis().pipeline(transaction=False)
+            pipe.lrange(key, offset, offset + size - 1)
+            pipe.llen(key)
+            items, total = await pipe.execute()
+        except (RedisError, OSError):
+            self.redis_errors += 1
+            return None
+
+        if not total:
+            self.expired += 1
+            return None
+
+        self.page_hits += 1
+        return [json.loads(item) for item in items], total
+
+    def stats(self) -> dict:
+        return {
+            "saves": self.saves,
+            "reuses": self.reuses,
+            "page_hits": self.page_hits,
+            "expired": self.expired,
+            "redis_errors": self.redis_errors,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+# Process-wide snapshot store
+search_snapshots = SearchSnapshotStore(ttl_seconds=settings.SEARCH_SNAPSHOT_TTL_SECONDS)
@@ -1,74 +1,211 @@
 # src/services/semantic_service.py
+"""
+Semantic (hybrid retrieval) search:
 
-from sqlalchemy import select
+1. Vector retriever (query embedding + vector search) and lexical
+   retriever (Postgres full-text) run concurrently, each under its own
+   timeout, so latency is max(vector, lexical) instead of the sum.
+   A retriever that times out or fails contributes no candidates.
+2. The two ranked lists are fused with SEMANTIC_FUSION:
+
+   rrf       Σ 1 / (SEMANTIC_RRF_K + rank) over the lists a product
+             appears in (rank-based, ignores score scales)
+   weighted  w × vector + (1 − w) × lexical, each list's scores
+             min-max normalized to [0, 1] first
+             (w = SEMANTIC_VECTOR_WEIGHT)
+"""
+
+import asyncio
+
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.models.product import Product
+from src.models.product import Product, FTS_CONFIG, search_document
 
-from src.core.embeddings import generate_local_embedding
+from src.core.config import settings
+from src.core.embeddings import get_query_embedding
+from src.core.metrics import RETRIEVER_FAILURES, stage
 from src.services.vector_service import vector_search
 
+FUSION_STRATEGIES = ("rrf", "weighted")
+
+
+# --------------------------------------
+# Fusion
+# --------------------------------------
+def reciprocal_rank_fusion(vector_hits: list, keyword_hits: list, k: int) -> dict:
+    """
+    product_id → fused score from 1-based ranks.
+    """
+    fused = {}
+    for hits in (vector_hits, keyword_hits):
+        for rank, item in enumerate(hits, start=1):
+            fused[item["product_id"]] = fused.get(item["product_id"], 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+def _min_max(hits: list) -> dict:
+    """
+    product_id → score scaled to [0, 1] within one retriever's list.
+    """
+    if not hits:
+        return {}
+
+    scores = [item["score"] for item in hits]
+    low = min(scores)
+    spread = max(scores) - low
+    if spread <= 0:
+        # All hits scored alike (e.g. the ILIKE fallback) → each is a full match
+        return {item["product_id"]: 1.0 for item in hits}
+
+    return {item["product_id"]: (item["score"] - low) / spread for item in hits}
+
+
+def weighted_fusion(vector_hits: list, keyword_hits: list, vector_weight: float) -> dict:
+    """
+    product_id → weighted sum of the normalized scores (0 where absent).
+    """
+    vector_scores = _min_max(vector_hits)
+    keyword_scores = _min_max(keyword_hits)
+
+    return {
+        product_id: (
+            vector_weight * vector_scores.get(product_id, 0.0)
+            + (1.0 - vector_weight) * keyword_scores.get(product_id, 0.0)
+        )
+        for product_id in vector_scores.keys() | keyword_scores.keys()
+    }
+
 
 class SemanticService:
 
     @staticmethod
-    async def search(query: str, limit: int, db: AsyncSession):
-        # 1️⃣ Generate query embedding
-        query_vector = generate_local_embedding(query)
-
-        # 2️⃣ Vector search from Qdrant
-        vector_results = await vector_search(query_vector, limit=limit)
+    async def keyword_search(query: str, limit: int, db: AsyncSession):
+        """
+        Lexical retrieval stage.
 
-        # Take top vector results product_ids
-        vector_product_ids = [p.payload["product_id"] for p in vector_results]
+        On PostgreSQL this matches the GIN-indexed tsvector of
+        title + description and scores hits with `ts_rank`.
+        Other databases (SQLite in local runs) fall back to ILIKE.
+        """
+        with stage("semantic", "postgres"):
+            if db.bind.dialect.name == "postgresql":
+                ts_query = func.websearch_to_tsquery(FTS_CONFIG, query)
+                rank = func.ts_rank(search_document, ts_query).label("rank")
 
-        # 3️⃣ Keyword search (Postgres)
-        stmt = select(Product).where(
-            (Product.title.ilike(f"%{query}%")) |
-            (Product.description.ilike(f"%{query}%"))
-        ).limit(limit)
+                stmt = (
+                    select(Product, rank)
+                    .where(search_document.op("@@")(ts_query))
+                    .order_by(rank.desc())
+                    .limit(limit)
+                )
+                rows = (await db.execute(stmt)).all()
 
-        keyword_products = (await db.execute(stmt)).scalars().all()
+            else:
+                stmt = select(Product).where(
+                    (Product.title.ilike(f"%{query}%")) |
+                    (Product.description.ilike(f"%{query}%"))
+                ).limit(limit)
+                rows = [(p, 0.5) for p in (await db.execute(stmt)).scalars().all()]
 
         # Convert to uniform format
-        keyword_results = [
+        return [
             {
                 "product_id": p.id,
                 "title": p.title,
                 "description": p.description,
                 "category": p.category,
                 "price": p.price,
-                "score": 0.5   # base keyword score
+                "score": float(score)
             }
-            for p in keyword_products
+            for p, score in rows
         ]
 
-        # Convert vector results
-        vector_results_formatted = [
+    @staticmethod
+    async def vector_retrieve(query: str, limit: int):
+        """
+        Vector retrieval stage: query embedding (cached) + vector search,
+        in the same format as `keyword_search` (score = cosine).
+        """
+        with stage("semantic", "embedding"):
+            query_vector = await get_query_embedding(query)
+
+        with stage("semantic", "qdrant"):
+            hits = await vector_search(query_vector, limit=limit)
+
+        return [
             {
                 "product_id": r.payload["product_id"],
                 "title": r.payload["title"],
                 "description": r.payload["description"],
                 "category": r.payload["category"],
                 "price": r.payload["price"],
-                "score": float(r.score)  # cosine similarity
+                "score": float(r.score)
             }
-            for r in vector_results
+            for r in hits
         ]
 
-        # 4️⃣ Combine + re-rank
-        combined = {item["product_id"]: item for item in keyword_results}
+    @staticmethod
+    async def _bounded(name: str, coro, timeout: float) -> list:
+        """
+        Await one retriever; on timeout or error return no candidates
+        so the other retriever still answers.
+        """
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            RETRIEVER_FAILURES.labels(name, "timeout").inc()
+            print(f"⚠️ {name} retriever exceeded {timeout}s — fusing without it")
+        except Exception as e:
+            RETRIEVER_FAILURES.labels(name, "error").inc()
+            print(f"⚠️ {name} retriever failed ({e!r}) — fusing without it")
+        return []
+
+    @staticmethod
+    async def search(query: str, limit: int, db: AsyncSession):
+        depth = max(limit, settings.SEMANTIC_RETRIEVER_DEPTH)
+
+        # 1️⃣ Both retrievers concurrently (only the lexical one uses the session)
+        with stage("semantic", "retrieval"):
+            vector_hits, keyword_hits = await asyncio.gather(
+                SemanticService._bounded(
+                    "vector",
+                    SemanticService.vector_retrieve(query, depth),
+                    settings.SEMANTIC_VECTOR_TIMEOUT_SECONDS
+                ),
+                SemanticService._bounded(
+                    "lexical",
+                    SemanticService.keyword_search(query, depth, db),
+                    settings.SEMANTIC_KEYWORD_TIMEOUT_SECONDS
+                ),
+            )
 
-        for v in vector_results_formatted:
-            if v["product_id"] in combined:
-                combined[v["product_id"]]["score"] += v["score"]  # boost
+        # 2️⃣ Fuse the two ranked lists
+        with stage("semantic", "fusion"):
+            if settings.SEMANTIC_FUSION == "rrf":
+                fused = reciprocal_rank_fusion(vector_hits, keyword_hits, settings.SEMANTIC_RRF_K)
+            elif settings.SEMANTIC_FUSION == "weighted":
+                fused = weighted_fusion(vector_hits, keyword_hits, settings.SEMANTIC_VECTOR_WEIGHT)
             else:
-                combined[v["product_id"]] = v
+                raise ValueError(
+                    f"Unknown SEMANTIC_FUSION {settings.SEMANTIC_FUSION!r}, expected one of {FUSION_STRATEGIES}"
+                )
 
-        # Sort by score desc
-        final_results = sorted(
-            combined.values(),
-            key=lambda x: x["score"],
-            reverse=True
-        )
+            vector_scores = {item["product_id"]: item["score"] for item in vector_hits}
+            keyword_scores = {item["product_id"]: item["score"] for item in keyword_hits}
+
+            # Product fields from whichever retriever found it
+            combined = {item["product_id"]: item for item in keyword_hits}
+            for item in vector_hits:
+                combined.setdefault(item["product_id"], item)
+
+            final_results = [
+                {
+                    **combined[product_id],
+                    "score": score,
+                    "vector_score": vector_scores.get(product_id),
+                    "keyword_score": keyword_scores.get(product_id),
+                }
+                for product_id, score in sorted(fused.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+            ]
 
-        return final_results[:limit]
+        return final_results
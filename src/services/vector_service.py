@@ -1,97 +1,58 @@
 # src/services/vector_service.py
 """
-Handles all Qdrant vector database operations:
-- Create collection
-- Insert product embeddings
-- Perform vector search
-"""
-
-from qdrant_client import QdrantClient
-from qdrant_client.http import models as qmodels
-from src.core.config import settings
-import uuid
-
-# Name of the vector collection inside Qdrant
-COLLECTION_NAME = "products_collection"
-
-
-def get_qdrant_client():
-    """
-    Returns an instance of QdrantClient connected to local Qdrant.
-    """
-    return QdrantClient(
-        host=settings.QDRANT_HOST,
-        port=settings.QDRANT_PORT,
-    )
-
-
-def init_qdrant_collection():
-    """
-    Ensures a clean Qdrant collection with a single unnamed vector field.
-
-    Qdrant 1.x (OLD API) supports only:
-        vector=[...]    → NOT named
-    So we recreate the collection in that format.
-    """
-    client = get_qdrant_client()
+Vector store facade.
 
-    # Delete old collection to avoid schema mismatch
-    collections = client.get_collections().collections
-    if COLLECTION_NAME in [c.name for c in collections]:
-        client.delete_collection(COLLECTION_NAME)
+Every caller (ingestion, search, reindex, event worker) goes through
+the functions re-exported here. VECTOR_BACKEND selects the module
+that implements them:
 
-    # Create NEW collection with the correct vector dimensions
-    client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=qmodels.VectorParams(
-            size=settings.EMBEDDING_DIM,       # Must match embedding model dim
-            distance=qmodels.Distance.COSINE   # Cosine similarity for search
-        )
-    )
+- qdrant: Qdrant server (src.services.qdrant_backend), default
+- numpy:  in-process exact index (src.services.numpy_backend)
 
-    print("✅ Collection created with OLD API format (single vector field).")
+A backend module provides:
 
+    COLLECTION_NAME, SEARCH_MODES
+    init_vector_store(), close_vector_store(), vector_store_ready()
+    new_collection_name(), create_versioned_collection(name),
+    get_alias_target(), swap_alias(name), delete_collection(name)
+    vector_upsert(id, vector, payload), vector_upsert_batch(points, ...)
+    vector_set_payloads(payloads, ...)
+    vector_search(vector, limit, filters, mode, collection_name)
+    vector_search_batch(vectors, limit, filters, mode, collection_name)
 
-def vector_upsert(product_id: str, vector: list, payload: dict):
-    """
-    Insert/Update a vector embedding into Qdrant.
-
-    Args:
-        product_id: Unique product UUID (also used as point ID)
-        vector: Embedding list (length = EMBEDDING_DIM)
-        payload: Metadata stored along with the vector
-    """
-    client = get_qdrant_client()
-
-    client.upsert(
-        collection_name=COLLECTION_NAME,
-        points=[
-            qmodels.PointStruct(
-                id=product_id,                 # Using product DB ID for consistency
-                vector=vector,                 # OLD API → must use `vector=` field
-                payload={**payload, "product_id": product_id}
-            )
-        ]
-    )
-
-
-async def vector_search(query_vector: list, limit: int = 5):
-    """
-    Performs vector similarity search inside Qdrant.
-
-    Args:
-        query_vector: Embedding of the search text
-        limit: How many similar products to return
-
-    Returns:
-        List of ScoredPoint objects
-    """
-    client = get_qdrant_client()
+Search hits expose `.id`, `.score` and `.payload` on both backends.
+"""
 
-    results = client.search(
-        collection_name=COLLECTION_NAME,
-        query_vector=query_vector,    # Vector to search against
-        limit=limit
-    )
+from src.core.config import settings
 
-    return results
+VECTOR_BACKENDS = ("qdrant", "numpy")
+
+if settings.VECTOR_BACKEND == "numpy":
+    from src.services import numpy_backend as backend
+elif settings.VECTOR_BACKEND == "qdrant":
+    from src.services import qdrant_backend as backend
+else:
+    raise ValueError(f"Unknown VECTOR_BACKEND {settings.VECTOR_BACKEND!r}, expected one of {VECTOR_BACKENDS}")
+
+
+COLLECTION_NAME = backend.COLLECTION_NAME
+SEARCH_MODES = backend.SEARCH_MODES
+
+# Lifecycle
+init_vector_store = backend.init_vector_store
+close_vector_store = backend.close_vector_store
+vector_store_ready = backend.vector_store_ready
+
+# Collections (blue/green reindex)
+new_collection_name = backend.new_collection_name
+create_versioned_collection = backend.create_versioned_collection
+get_alias_target = backend.get_alias_target
+swap_alias = backend.swap_alias
+delete_collection = backend.delete_collection
+
+# Points
+vector_upsert = backend.vector_upsert
+vector_upsert_batch = backend.vector_upsert_batch
+vector_set_payloads = backend.vector_set_payloads
+vector_search = backend.vector_search
+vector_search_batch = backend.vector_search_batch
@@ -2,100 +2,490 @@
 
 import asyncio
 import json
-import redis
-from sqlalchemy import update, select
+import math
+import socket
+import time
+from datetime import datetime
+import redis.asyncio as aioredis
+from prometheus_client import start_http_server
+from redis.exceptions import ResponseError
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.database import AsyncSessionLocal
 from src.core.config import settings
+from src.core.metrics import EVENTS_PROCESSED, stage
 from src.models.product import Product
 from src.models.event import UserEvent
+from src.services.behavior_service import BehaviorService, bucket_start
+from src.services.learning_service import (
+    BEHAVIOR_FIELDS,
+    EVENT_COUNTERS,
+    EVENT_WEIGHTS,
+    behavior_payload,
+    compute_behavior_score,
+    decay_factor,
+)
+from src.services.vector_service import vector_set_payloads
+from src.services.result_cache import BEHAVIOR_VERSION_KEY, bump_version
+from src.services.product_cache import publish_invalidation
 
 
 EVENT_STREAM = "user_events"
 
+# Consumer group of the workers: each event is delivered to one worker
+# and stays pending until acknowledged after its batch commits
+EVENT_GROUP = "event_processor"
+
 
 # --------------------------------------
 # Redis client
 # --------------------------------------
 def get_redis_client():
-    return redis.Redis(
+    return aioredis.Redis(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
         decode_responses=True
     )
 
 
+# --------------------------------------
+# Behavior payload sync (Postgres → Qdrant)
+# --------------------------------------
+class BehaviorPayloadSync:
+    """
+    Tracks products whose counters changed and pushes their
+    behavior score into the Qdrant payload in throttled batches.
+
+    A product's payload is at most `interval` seconds behind
+    Postgres (BEHAVIOR_PAYLOAD_FLUSH_SECONDS).
+
+    The behavior version stamp is part of every search-response cache
+    key, so bumping it drops the whole cache. Pushes are therefore
+    only announced every `version_interval` seconds
+    (BEHAVIOR_VERSION_MIN_INTERVAL_SECONDS): a cached response may
+    rank on behavior up to that much older than the payload.
+    """
+
+    def __init__(self, interval: float, version_interval: float = 0.0):
+        self.interval = interval
+        self.version_interval = version_interval
+        self.dirty = set()
+        self.last_flush = time.monotonic()
+
+        # Payload pushes not yet announced by a version bump
+        self.version_stale = False
+        self.last_bump = 0.0
+
+    def mark(self, product_id: str):
+        self.dirty.add(product_id)
+
+    def bump_due(self) -> bool:
+        return self.version_stale and time.monotonic() - self.last_bump >= self.version_interval
+
+    def due(self) -> bool:
+        if self.bump_due():
+            return True
+        return bool(self.dirty) and time.monotonic() - self.last_flush >= self.interval
+
+    async def flush(self, db: AsyncSession, redis_client=None):
+        """
+        Invalidate the API processes' cached rows of all dirty
+        products, read their current counters in one query, push them
+        to Qdrant in one batched payload update and, only once Qdrant
+        has applied it, bump the behavior version so cached search
+        responses refresh (at most every `version_interval` seconds).
+        """
+        product_ids = list(self.dirty)
+        self.dirty.clear()
+        self.last_flush = time.monotonic()
+
+        if product_ids:
+            # API processes drop their cached rows of these products
+            await publish_invalidation(product_ids, redis_client)
+
+            stmt = select(
+                Product.id,
+                *[getattr(Product, f) for f in BEHAVIOR_FIELDS],
+                Product.behavior_score,
+                Product.behavior_updated_at
+            ).where(Product.id.in_(product_ids))
+            rows = (await db.execute(stmt)).all()
+
+            try:
+                await vector_set_payloads({row.id: behavior_payload(row) for row in rows})
+            except Exception as e:
+                # Retry on the next flush instead of dropping the update
+                self.dirty.update(product_ids)
+                print(f"⚠️ Behavior payload push failed: {e}")
+                return
+
+            self.version_stale = True
+
+        if self.bump_due():
+            await bump_version(BEHAVIOR_VERSION_KEY, redis_client)
+            self.version_stale = False
+            self.last_bump = time.monotonic()
+
+
 # --------------------------------------
 # Event Processing Logic
 # --------------------------------------
-async def process_event(event_data: dict, db: AsyncSession):
-
-    # Save raw event to DB
-    event = UserEvent(
-        id=event_data.get("id"),
-        user_id=event_data.get("user_id"),
-        session_id=event_data.get("session_id"),
-        event_type=event_data.get("event_type"),
-        query=event_data.get("query"),
-        product_id=event_data.get("product_id"),
-        event_data=event_data.get("metadata"),
-    )
-    db.add(event)
 
-    # Update product behavioral signals
-    product_id = event_data.get("product_id")
-    if product_id:
-        stmt = select(Product).where(Product.id == product_id)
-        product = (await db.execute(stmt)).scalar_one_or_none()
+# One set-based UPDATE, executed with a list of per-product deltas:
+#   UPDATE products SET click_count = click_count + :click_count_delta, ...,
+#                       behavior_score = :behavior_score, behavior_updated_at = :behavior_updated_at
+_products = Product.__table__
+COUNTER_UPDATE = (
+    _products.update()
+    .where(_products.c.id == bindparam("product_id_key"))
+    .values({
+        **{
+            column: func.coalesce(_products.c[column], 0) + bindparam(f"{column}_delta")
+            for column in EVENT_COUNTERS.values()
+        },
+        "behavior_score": bindparam("behavior_score"),
+        "behavior_updated_at": bindparam("behavior_updated_at"),
+    })
+)
+
+
+def stream_time(stream_id: str, default: float) -> float:
+    """
+    Unix seconds an event was added to the stream (from its
+    `<ms>-<seq>` id), so late processing does not make it look newer.
+    """
+    try:
+        return int(stream_id.split("-", 1)[0]) / 1000
+    except (AttributeError, ValueError):
+        return default
+
+
+def dwell_seconds(metadata, dwell_time):
+    """
+    Dwell amount of an event (`metadata.seconds`, else `dwell_time`),
+    or None if it is not a finite, non-negative number.
+    """
+    value = metadata.get("seconds", dwell_time) if isinstance(metadata, dict) else dwell_time
+    if value is None:
+        return 0
+
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    if isinstance(value, bool) or not math.isfinite(amount) or amount < 0:
+        return None
+    return amount
+
+
+def parse_events(events: list) -> list:
+    """
+    (stream_id, data) of each well-formed event of one read, where
+    `data` is the decoded event dict; malformed entries are logged and
+    skipped (they are still acknowledged with the batch).
+    """
+    parsed = []
+    for stream_id, payload in events:
+        try:
+            data = json.loads(payload["data"])
+        except (KeyError, TypeError, ValueError):
+            data = None
+        if not isinstance(data, dict):
+            print(f"⚠️ Skipping malformed event {stream_id}")
+            continue
+        parsed.append((stream_id, data))
+    return parsed
+
+
+def event_row(stream_id: str, data: dict) -> dict:
+    """
+    UserEvent insert row of a parsed event.
+    """
+    return {
+        "id": data.get("id") or stream_id,
+        "user_id": data.get("user_id"),
+        "session_id": data.get("session_id"),
+        "event_type": data.get("event_type"),
+        "query": data.get("query"),
+        "product_id": data.get("product_id"),
+        "event_data": data.get("metadata"),
+    }
+
+
+def fold_events(events: list, now: float = None) -> tuple[dict, dict, dict]:
+    """
+    Fold parsed events into:
+    - per-product counter deltas
+    - per-product behavior score added by the batch, decayed to `now`
+    - hourly bucket amounts
+
+    Args:
+        events: List of (stream_id, data) tuples from `parse_events`
+        now: Unix seconds the score deltas are decayed to
+
+    Returns:
+        (deltas, score_deltas, buckets) where deltas maps
+        product_id → {column: delta}, score_deltas product_id → score
+        and buckets (product_id, event_type, bucket_start) → amount
+    """
+    now = time.time() if now is None else now
+
+    deltas = {}
+    score_deltas = {}
+    buckets = {}
+
+    for stream_id, data in events:
+        metadata = data.get("metadata") or {}
+        if not isinstance(metadata, dict):
+            metadata = {}
+
+        product_id = data.get("product_id")
+        column = EVENT_COUNTERS.get(data.get("event_type"))
+        if not product_id or column is None:
+            continue
+
+        if column == "total_dwell_time":
+            amount = dwell_seconds(metadata, data.get("dwell_time"))
+            if amount is None:
+                # Raw event is still stored; a bad amount must not fail the batch
+                print(f"⚠️ Skipping dwell amount of event {stream_id}: {metadata.get('seconds')!r}")
+                continue
+        else:
+            amount = 1
+
+        product_deltas = deltas.setdefault(product_id, dict.fromkeys(EVENT_COUNTERS.values(), 0))
+        product_deltas[column] += amount
+
+        event_time = stream_time(stream_id, now)
+        score_deltas[product_id] = score_deltas.get(product_id, 0.0) + (
+            EVENT_WEIGHTS[data["event_type"]] * amount * float(decay_factor(now - event_time))
+        )
+
+        key = (product_id, data["event_type"], bucket_start(event_time))
+        buckets[key] = buckets.get(key, 0) + amount
+
+    return deltas, score_deltas, buckets
+
+
+def _insert_events(dialect_name: str):
+    """
+    INSERT … ON CONFLICT (id) DO NOTHING RETURNING id: an event seen
+    before (redelivered after a crash) is not stored again.
+    """
+    if dialect_name == "postgresql":
+        stmt = postgresql.insert(UserEvent)
+    elif dialect_name == "sqlite":
+        stmt = sqlite.insert(UserEvent)
+    else:
+        raise RuntimeError(f"The event worker does not support the {dialect_name} dialect")
 
-        if product:
-            if event_data["event_type"] == "click":
-                product.click_count += 1
+    return stmt.on_conflict_do_nothing(index_elements=[UserEvent.id]).returning(UserEvent.id)
 
-            elif event_data["event_type"] == "add_to_cart":
-                product.cart_count += 1
 
-            elif event_data["event_type"] == "purchase":
-                product.purchase_count += 1
+async def process_batch(events: list, db: AsyncSession, behavior_sync: BehaviorPayloadSync = None):
+    """
+    Apply one read batch in a single transaction:
+    1. Bulk insert the raw events, skipping ids already stored
+    2. Fold only the newly inserted events (a redelivered batch
+       does not count twice)
+    3. Read the current decayed scores of the touched products
+    4. One executemany UPDATE with per-product counter deltas and
+       new scores (old score aged to now + the batch's score)
+    5. Add the batch to the hourly behavior buckets
+    """
+    now = time.time()
+    parsed = parse_events(events)
+
+    fresh = []
+    if parsed:
+        rows = [event_row(stream_id, data) for stream_id, data in parsed]
+        result = await db.execute(_insert_events(db.bind.dialect.name), rows)
+        inserted = set(result.scalars().all())
+
+        for event, row in zip(parsed, rows):
+            # Duplicate ids within the batch count once
+            if row["id"] in inserted:
+                inserted.discard(row["id"])
+                fresh.append(event)
+
+    deltas, score_deltas, buckets = fold_events(fresh, now)
+
+    if deltas:
+        stmt = select(Product.id, Product.behavior_score, Product.behavior_updated_at).where(
+            Product.id.in_(list(deltas))
+        )
+        current = {row.id: compute_behavior_score(row, now) for row in (await db.execute(stmt)).all()}
+        updated_at = datetime.utcfromtimestamp(now)
 
-            elif event_data["event_type"] == "dwell":
-                dwell = event_data.get("metadata", {}).get("seconds", 0)
-                product.total_dwell_time += dwell
+        await db.execute(
+            COUNTER_UPDATE,
+            [
+                {
+                    "product_id_key": product_id,
+                    **{f"{column}_delta": delta for column, delta in product_deltas.items()},
+                    "behavior_score": current.get(product_id, 0.0) + score_deltas[product_id],
+                    "behavior_updated_at": updated_at,
+                }
+                for product_id, product_deltas in deltas.items()
+            ]
+        )
 
-            elif event_data["event_type"] == "bounce":
-                product.bounce_count += 1
+        await BehaviorService.record_buckets(db, buckets)
 
     await db.commit()
 
+    if behavior_sync is not None:
+        for product_id in deltas:
+            behavior_sync.mark(product_id)
+
+
+class ThroughputMeter:
+    """
+    Counts processed events and reports events/sec periodically.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.count = 0
+        self.window_start = time.monotonic()
+
+    def add(self, n: int):
+        self.count += n
+
+        elapsed = time.monotonic() - self.window_start
+        if elapsed >= self.interval:
+            if self.count:
+                print(f"📈 {self.count / elapsed:.1f} events/sec ({self.count} events in {elapsed:.1f}s)")
+            self.count = 0
+            self.window_start = time.monotonic()
+
 
 # --------------------------------------
 # Worker Loop
 # --------------------------------------
+async def ensure_consumer_group(redis_client):
+    """
+    Create EVENT_GROUP (and the stream) if missing. A new group starts
+    at the beginning of the stream; events already stored are skipped
+    by the idempotent insert.
+    """
+    try:
+        await redis_client.xgroup_create(EVENT_STREAM, EVENT_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def read_batch(redis_client, consumer: str, block_ms: int, after_id: str = ">") -> list:
+    """
+    Read up to EVENT_BATCH_SIZE events for `consumer`.
+
+    With `after_id` ">" (new events), blocks up to `block_ms` for the
+    first event, then keeps reading until the batch is full or
+    EVENT_FLUSH_INTERVAL_MS has passed since the first event arrived,
+    so trickling traffic is still written in few, larger transactions.
+
+    Any other `after_id` re-reads the events delivered to `consumer`
+    but not acknowledged (a crash before the commit), without blocking.
+
+    Returns [] when nothing arrived.
+    """
+    if after_id != ">":
+        messages = await redis_client.xreadgroup(
+            EVENT_GROUP, consumer, {EVENT_STREAM: after_id}, count=settings.EVENT_BATCH_SIZE
+        )
+        return messages[0][1] if messages else []
+
+    events = []
+    deadline = None
+
+    while len(events) < settings.EVENT_BATCH_SIZE:
+        if deadline is None:
+            timeout_ms = block_ms
+        else:
+            timeout_ms = int((deadline - time.monotonic()) * 1000)
+            if timeout_ms <= 0:
+                break
+
+        messages = await redis_client.xreadgroup(
+            EVENT_GROUP,
+            consumer,
+            {EVENT_STREAM: ">"},
+            count=settings.EVENT_BATCH_SIZE - len(events),
+            block=timeout_ms      # ≥ 1 (0 would block forever)
+        )
+        if not messages or not messages[0][1]:
+            break
+
+        events.extend(messages[0][1])
+
+        if deadline is None:
+            deadline = time.monotonic() + settings.EVENT_FLUSH_INTERVAL_MS / 1000
+
+    return events
+
+
 async def event_worker():
     print("🚀 Event Processor Started... Listening on Redis Stream")
+
+    if settings.EVENT_WORKER_METRICS_PORT:
+        # Prometheus scrape target for the worker's stage histograms
+        start_http_server(settings.EVENT_WORKER_METRICS_PORT)
+        print(f"📊 Metrics on :{settings.EVENT_WORKER_METRICS_PORT}/metrics")
+
     redis_client = get_redis_client()
+    behavior_sync = BehaviorPayloadSync(
+        settings.BEHAVIOR_PAYLOAD_FLUSH_SECONDS,
+        settings.BEHAVIOR_VERSION_MIN_INTERVAL_SECONDS
+    )
+    last_prune = time.monotonic()
+    meter = ThroughputMeter(settings.EVENT_REPORT_INTERVAL_SECONDS)
 
-    last_id = "0-0"     # read from beginning
+    # Idle wait for the first event: never longer than the flush
+    # interval or the payload staleness bound
+    block_ms = max(1, int(min(
+        settings.EVENT_FLUSH_INTERVAL_MS,
+        settings.BEHAVIOR_PAYLOAD_FLUSH_SECONDS * 1000
+    )))
+
+    await ensure_consumer_group(redis_client)
+    consumer = settings.EVENT_CONSUMER_NAME or socket.gethostname()
+
+    # First re-read what this consumer got but never acknowledged
+    # (id "0" = its pending entries), then new events (">")
+    after_id = "0"
 
     while True:
-        messages = redis_client.xread(
-            {EVENT_STREAM: last_id},
-            block=5000,   # wait 5 seconds
-            count=10
-        )
+        # Includes time spent blocked waiting for the batch to fill
+        with stage("event_worker", "redis_read"):
+            events = await read_batch(redis_client, consumer, block_ms, after_id)
+
+        if after_id != ">":
+            after_id = events[-1][0] if events else ">"
 
-        if messages:
-            stream, events = messages[0]
+        if events:
+            with stage("event_worker", "postgres"):
+                async with AsyncSessionLocal() as db:
+                    await process_batch(events, db, behavior_sync)
 
-            async with AsyncSessionLocal() as db:
-                for event_id, payload in events:
-                    data = json.loads(payload["data"])
+            # Only once committed: a crash before this replays the batch
+            await redis_client.xack(EVENT_STREAM, EVENT_GROUP, *[stream_id for stream_id, _ in events])
 
-                    await process_event(data, db)
+            meter.add(len(events))
+            EVENTS_PROCESSED.inc(len(events))
 
-                    last_id = event_id
+        if behavior_sync.due():
+            with stage("event_worker", "qdrant_payload"):
+                async with AsyncSessionLocal() as db:
+                    await behavior_sync.flush(db, redis_client)
 
-        await asyncio.sleep(0.1)
+        if time.monotonic() - last_prune >= settings.BEHAVIOR_BUCKET_PRUNE_INTERVAL_SECONDS:
+            with stage("event_worker", "bucket_prune"):
+                async with AsyncSessionLocal() as db:
+                    await BehaviorService.prune_buckets(db)
+            last_prune = time.monotonic()
 
 
 # --------------------------------------